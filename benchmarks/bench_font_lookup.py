@@ -0,0 +1,107 @@
+"""
+字体查找基准测试
+比较逐字符查找支持字体的三种实现：
+  - shuffle_scan: 旧版 enhanced_font_randomizer.FontManager（每个字符打乱字体列表后逐个探测）
+  - collect_choice: 旧版 font_manager.FontManager（收集全部支持字体后random.choice）
+  - coverage_index: 当前 FontManager（CoverageIndex 区间索引 + random.choice）
+
+用法:
+    python benchmarks/bench_font_lookup.py [--fonts 40] [--chars 200000] [--fonts-dir fonts]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from font_coverage import CharCoverage, CoverageIndex  # noqa: E402
+
+
+def make_synthetic_fonts(font_count, rng):
+    """生成模拟的字体字符集：全部覆盖ASCII，部分覆盖常用CJK区段"""
+    fonts = {}
+    for i in range(font_count):
+        chars = set(range(0x20, 0x7F))
+        if rng.random() < 0.6:
+            start = 0x4E00 + rng.randrange(0, 2000)
+            chars.update(range(start, start + rng.randrange(3000, 20000)))
+        chars.update(range(0x3000, 0x3040))
+        fonts[f"Font{i:02d}"] = chars
+    return fonts
+
+
+def make_text(char_count, rng):
+    """生成中英文混排的测试文本"""
+    pool = [chr(c) for c in range(0x41, 0x7B)] + [chr(c) for c in range(0x4E00, 0x4E00 + 6000)]
+    return [rng.choice(pool) for _ in range(char_count)]
+
+
+def shuffle_scan(font_sets, char):
+    char_code = ord(char)
+    font_names = list(font_sets.keys())
+    random.shuffle(font_names)
+    for font_name in font_names:
+        if char_code in font_sets[font_name]:
+            return font_name
+    return None
+
+
+def collect_choice(font_sets, char):
+    char_code = ord(char)
+    supported_fonts = []
+    for font_name, chars in font_sets.items():
+        if char_code in chars:
+            supported_fonts.append(font_name)
+    if supported_fonts:
+        return random.choice(supported_fonts)
+    return None
+
+
+def index_choice(index, char):
+    candidates = index.fonts_for(ord(char))
+    if not candidates:
+        return None
+    return random.choice(candidates)
+
+
+def measure(name, lookup, container, text):
+    start = time.perf_counter()
+    for char in text:
+        lookup(container, char)
+    elapsed = time.perf_counter() - start
+    per_char_ns = elapsed / len(text) * 1e9
+    print(f"{name:<16} {elapsed:8.3f} s  {per_char_ns:10.1f} ns/字符")
+    return per_char_ns
+
+
+def main():
+    parser = argparse.ArgumentParser(description="字体查找基准测试")
+    parser.add_argument("--fonts", type=int, default=40, help="模拟字体数量")
+    parser.add_argument("--chars", type=int, default=200000, help="查找的字符数量")
+    parser.add_argument("--fonts-dir", help="使用真实字体目录代替模拟字体")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    if args.fonts_dir:
+        from font_manager import FontManager
+        font_manager = FontManager(args.fonts_dir)
+        font_sets = {name: set(info['chars']) for name, info in font_manager.font_cache.items()}
+    else:
+        font_sets = make_synthetic_fonts(args.fonts, rng)
+    text = make_text(args.chars, rng)
+
+    index = CoverageIndex({name: CharCoverage.from_chars(chars) for name, chars in font_sets.items()})
+
+    print(f"字体数量: {len(font_sets)}, 字符数量: {len(text)}, 索引分段: {len(index)}")
+    baseline = measure("shuffle_scan", shuffle_scan, font_sets, text)
+    measure("collect_choice", collect_choice, font_sets, text)
+    current = measure("coverage_index", index_choice, index, text)
+    print(f"相对 shuffle_scan 加速: {baseline / current:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+run生成基准测试
+比较两种run生成方式的吞吐量，并校验二者生成的XML一致：
+  - proxy: add_styled_run（python-docx的Run/Font代理对象，逐个添加）
+  - lxml:  RunEmitter（克隆预构建的<w:r>模板，批量插入）
+
+用法:
+    python benchmarks/bench_run_emission.py [--paragraphs 200] [--chars 500] [--fonts 10]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from docx import Document  # noqa: E402
+from lxml import etree  # noqa: E402
+from run_emitter import RunEmitter, add_styled_run  # noqa: E402
+
+
+def make_segments(paragraph_count, chars_per_paragraph, font_count, rng):
+    """生成每个段落逐字符的run属性"""
+    fonts = [f"Font{i:02d}" for i in range(font_count)] + [None]
+    pool = [chr(c) for c in range(0x41, 0x7B)] + [chr(c) for c in range(0x4E00, 0x4E00 + 3000)] + [' ']
+    paragraphs = []
+    for _ in range(paragraph_count):
+        bold = rng.choice([None, True])
+        segments = []
+        for _ in range(chars_per_paragraph):
+            tilt = rng.choice([None, rng.randint(-4, 4)])
+            position = rng.choice([None, rng.randint(-5, 5)])
+            key = (rng.choice(fonts), bold, None, None, rng.randint(19, 23), tilt, position)
+            segments.append((rng.choice(pool), key))
+        paragraphs.append(segments)
+    return paragraphs
+
+
+def run_proxy(paragraphs):
+    doc = Document()
+    for segments in paragraphs:
+        paragraph = doc.add_paragraph()
+        for text, key in segments:
+            add_styled_run(paragraph, text, key)
+    return doc
+
+
+def run_lxml(paragraphs):
+    doc = Document()
+    emitter = RunEmitter()
+    for segments in paragraphs:
+        emitter.emit(doc.add_paragraph(), segments)
+    return doc
+
+
+def measure(name, func, paragraphs, char_count):
+    start = time.perf_counter()
+    doc = func(paragraphs)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<6} {elapsed:8.3f} s  {char_count / elapsed:12.0f} run/s")
+    return elapsed, doc
+
+
+def main():
+    parser = argparse.ArgumentParser(description="run生成基准测试")
+    parser.add_argument("--paragraphs", type=int, default=200)
+    parser.add_argument("--chars", type=int, default=500, help="每个段落的字符数")
+    parser.add_argument("--fonts", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    paragraphs = make_segments(args.paragraphs, args.chars, args.fonts, rng)
+    char_count = args.paragraphs * args.chars
+
+    print(f"段落: {args.paragraphs}, 每段字符: {args.chars}, 字体: {args.fonts}")
+    proxy_time, proxy_doc = measure("proxy", run_proxy, paragraphs, char_count)
+    lxml_time, lxml_doc = measure("lxml", run_lxml, paragraphs, char_count)
+
+    identical = (etree.tostring(proxy_doc.element.body) == etree.tostring(lxml_doc.element.body))
+    print(f"加速: {proxy_time / lxml_time:.1f}x, XML一致: {identical}")
+
+
+if __name__ == "__main__":
+    main()
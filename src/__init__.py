@@ -1,13 +1,24 @@
-"""
-字体随机替换工具源代码包
-字符级字体随机替换工具 - 将Word文档中的每个字符随机替换为不同字体
-"""
-
-__version__ = "1.4.0"
-__author__ = "Font Randomizer Project"
-__email__ = "support@example.com"
-
-from .enhanced_font_randomizer import FontRandomizerApp, HandwritingSimulator, LineSpacingManager
-from .font_manager import FontManager
-
-__all__ = ['FontRandomizerApp', 'FontManager', 'HandwritingSimulator', 'LineSpacingManager']
\ No newline at end of file
+"""
+字体随机替换工具源代码包
+字符级字体随机替换工具 - 将Word文档中的每个字符随机替换为不同字体
+"""
+
+__version__ = "1.4.0"
+__author__ = "Font Randomizer Project"
+__email__ = "support@example.com"
+
+from .converter import (ConversionCancelled, ConversionOptions, DocumentConverter, HandwritingSimulator,
+                        LineSpacingManager, convert)
+from .coverage_plan import CoverageError
+from .font_manager import FontManager
+
+try:
+    from .enhanced_font_randomizer import FontRandomizerApp
+except ImportError:
+    # 没有Tkinter的环境（如无界面服务器）只提供转换接口
+    FontRandomizerApp = None
+
+__all__ = [
+    'FontRandomizerApp', 'FontManager', 'HandwritingSimulator', 'LineSpacingManager',
+    'ConversionOptions', 'ConversionCancelled', 'CoverageError', 'DocumentConverter', 'convert'
+]
\ No newline at end of file
@@ -0,0 +1,248 @@
+"""
+命令行入口
+无需图形界面即可转换文档，例如:
+    python -m src convert in.docx out.docx --handwriting 3 --char-size 3
+    python -m src batch input_dir output_dir --workers 4
+    python -m src serve --port 8765 --workers 4
+    python -m src bench --paragraphs 500 --output bench.json
+"""
+
+import sys
+import json
+import argparse
+
+from .batch import SUMMARY_FILENAME, convert_batch
+from .benchmark import TOGGLES, BenchmarkSpec, format_summary, run_benchmark
+from .converter import RUN_MERGE_STEP, ConversionOptions, convert, stats_to_dict
+from .coverage_plan import COVERAGE_OFF, COVERAGE_POLICIES
+from .font_manager import FontManager
+from .package_io import DEFAULT_COMPRESS_LEVEL
+from .profiling import PROFILE_SUFFIX, format_profile
+from .result_cache import DEFAULT_MAX_BYTES, ResultCache
+from .service import DEFAULT_HOST, DEFAULT_MAX_QUEUE, DEFAULT_PORT, serve
+
+STRENGTH_CHOICES = range(0, 6)
+
+
+def add_effect_arguments(parser):
+    """添加效果相关的命令行参数（力度1-5，0表示关闭该效果）"""
+    group = parser.add_argument_group("效果设置", "力度取值1-5，0表示关闭该效果")
+    group.add_argument("--handwriting", type=int, choices=STRENGTH_CHOICES, default=3,
+                       metavar="0-5", help="手写模拟自然度（默认3）")
+    group.add_argument("--line-spacing", type=int, choices=STRENGTH_CHOICES, default=3,
+                       metavar="0-5", help="行间距随机力度（默认3）")
+    group.add_argument("--char-size", type=int, choices=STRENGTH_CHOICES, default=3,
+                       metavar="0-5", help="字号随机力度（默认3）")
+    group.add_argument("--indent", type=int, choices=STRENGTH_CHOICES, default=3,
+                       metavar="0-5", help="行首缩进随机力度（默认3）")
+    group.add_argument("--merge-runs", action="store_true",
+                       help="合并属性相同的相邻字符，减少run数量")
+    group.add_argument("--merge-step", type=float, default=RUN_MERGE_STEP,
+                       help=f"合并时字号和位置的量化档位，单位磅（默认{RUN_MERGE_STEP}）")
+    group.add_argument("--no-fast-emitter", action="store_true",
+                       help="使用python-docx代理对象生成run（较慢，用于对照）")
+    group.add_argument("--no-vectorized", action="store_true",
+                       help="逐字符计算属性，不使用NumPy批量生成（较慢，用于对照）")
+    group.add_argument("--paragraph-workers", type=int, default=1, metavar="N",
+                       help="段落并行的进程数，适合单个超大文档（默认1不并行，0为CPU核心数）")
+    group.add_argument("--streaming", action="store_true",
+                       help="流式改写正文，内存占用只与最大的段落/表格有关，适合超大文档")
+    group.add_argument("--compress-level", type=int, choices=range(10), default=DEFAULT_COMPRESS_LEVEL,
+                       metavar="0-9", help=f"重新写入部件的压缩级别（默认{DEFAULT_COMPRESS_LEVEL}）")
+    group.add_argument("--seed", type=int,
+                       help="随机种子，指定后相同的文档和字体总是得到相同的结果")
+    group.add_argument("--coverage", choices=COVERAGE_POLICIES, default=COVERAGE_OFF,
+                       help="转换前检查字体对文档字符的覆盖情况：report 只报告，abort 存在没有字体支持的字符时停止，"
+                            "fallback 这些字符使用 --fallback-font（默认off不检查）")
+    group.add_argument("--fallback-font", help="没有字体支持的字符使用的字体名称（配合 --coverage fallback）")
+
+
+def add_cache_arguments(parser):
+    """添加转换结果缓存的命令行参数"""
+    group = parser.add_argument_group("结果缓存", "仅在指定了 --seed 时生效")
+    group.add_argument("--cache-dir", help="转换结果缓存目录，相同的文档、选项和字体直接返回之前的结果")
+    group.add_argument("--cache-size", type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024), metavar="MB",
+                       help=f"缓存大小上限，超出时删除最久未使用的结果（默认{DEFAULT_MAX_BYTES // (1024 * 1024)} MB）")
+
+
+def add_profile_arguments(parser):
+    """添加性能分析的命令行参数"""
+    group = parser.add_argument_group("性能分析", f"结果写入统计信息和 <输出文件>{PROFILE_SUFFIX}")
+    group.add_argument("--profile", action="store_true",
+                       help="记录加载、预处理、属性计算、run生成、保存等各阶段的耗时和调用次数")
+    group.add_argument("--profile-functions", action="store_true",
+                       help="同时以cProfile记录逐函数的耗时和调用次数（较慢）")
+    group.add_argument("--profile-memory", action="store_true",
+                       help="同时以tracemalloc记录各阶段的内存峰值（较慢）")
+
+
+def options_from_args(args):
+    """由命令行参数构建转换选项"""
+    return ConversionOptions(
+        handwriting=args.handwriting > 0,
+        handwriting_strength=max(1, args.handwriting),
+        random_line_spacing=args.line_spacing > 0,
+        line_spacing_strength=max(1, args.line_spacing),
+        random_char_size=args.char_size > 0,
+        char_size_strength=max(1, args.char_size),
+        random_indent=args.indent > 0,
+        indent_strength=max(1, args.indent),
+        merge_runs=args.merge_runs,
+        merge_step=args.merge_step,
+        fast_emitter=not args.no_fast_emitter,
+        vectorized=not args.no_vectorized,
+        streaming=args.streaming,
+        paragraph_workers=args.paragraph_workers,
+        compress_level=args.compress_level,
+        seed=args.seed,
+        profile=args.profile or args.profile_functions or args.profile_memory,
+        profile_functions=args.profile_functions,
+        profile_memory=args.profile_memory,
+        coverage_policy=args.coverage,
+        fallback_font=args.fallback_font
+    )
+
+
+def run_convert(args):
+    """convert 子命令"""
+    log = (lambda message: None) if args.quiet else print
+    font_manager = FontManager(args.fonts_dir)
+    stats = convert(args.input, args.output, options_from_args(args),
+                    font_manager=font_manager, log=log, cache_dir=args.cache_dir,
+                    cache_max_bytes=args.cache_size * 1024 * 1024)
+
+    log(f"字符级字体替换完成: {args.output}")
+    log(f"总共处理了 {stats['total_chars']} 个字符，"
+        f"未找到合适字体的字符 {stats['chars_without_font']} 个，"
+        f"使用了 {len(stats['used_fonts'])} 种不同的字体")
+    if 'profile' in stats:
+        for line in format_profile(stats['profile']):
+            log(line)
+
+    if args.stats_json:
+        with open(args.stats_json, "w", encoding="utf-8") as f:
+            json.dump(stats_to_dict(stats), f, ensure_ascii=False, indent=2)
+    return 0
+
+
+def run_batch(args):
+    """batch 子命令"""
+    log = (lambda message: None) if args.quiet else print
+    font_manager = FontManager(args.fonts_dir)
+    summary = convert_batch(args.source, args.output_dir, options_from_args(args),
+                            workers=args.workers, font_manager=font_manager, log=log,
+                            use_threads=args.threads, cache_dir=args.cache_dir,
+                            cache_max_bytes=args.cache_size * 1024 * 1024, resume=args.resume)
+    log(f"汇总信息已写入: {args.output_dir}/{SUMMARY_FILENAME}")
+    return 0 if summary['failed'] == 0 else 1
+
+
+def run_serve(args):
+    """serve 子命令"""
+    font_manager = FontManager(args.fonts_dir)
+    if len(font_manager.font_files) < 2:
+        raise ValueError("至少需要2个字体文件才能实现字符级随机替换")
+    result_cache = ResultCache(args.cache_dir, args.cache_size * 1024 * 1024) if args.cache_dir else None
+    serve(font_manager, options_from_args(args), host=args.host, port=args.port,
+          workers=args.workers, max_queue=args.max_queue, work_dir=args.work_dir,
+          result_cache=result_cache)
+    return 0
+
+
+def run_bench(args):
+    """bench 子命令"""
+    spec = BenchmarkSpec(
+        paragraphs=args.paragraphs,
+        chars_per_paragraph=args.chars,
+        table_ratio=args.table_ratio,
+        cjk_ratio=args.cjk_ratio,
+        fonts=args.fonts,
+        repeat=args.repeat,
+        seed=args.seed
+    )
+    toggles = args.toggles.split(",") if args.toggles else None
+    results = run_benchmark(spec, toggles)
+    print(format_summary(results))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"测量结果已写入: {args.output}")
+    else:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m src",
+        description="字符级字体随机替换工具（命令行版）"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    convert_parser = subparsers.add_parser("convert", help="转换单个文档")
+    convert_parser.add_argument("input", help="输入的.docx文件")
+    convert_parser.add_argument("output", help="输出的.docx文件")
+    convert_parser.add_argument("--fonts-dir", default="fonts", help="字体目录（默认fonts）")
+    convert_parser.add_argument("--stats-json", help="将统计信息写入JSON文件")
+    convert_parser.add_argument("-q", "--quiet", action="store_true", help="不输出处理日志")
+    add_effect_arguments(convert_parser)
+    add_cache_arguments(convert_parser)
+    add_profile_arguments(convert_parser)
+    convert_parser.set_defaults(func=run_convert)
+
+    batch_parser = subparsers.add_parser("batch", help="批量转换目录或通配符匹配的文档")
+    batch_parser.add_argument("source", help="输入目录，或通配符如 \"in/**/*.docx\"")
+    batch_parser.add_argument("output_dir", help="输出目录")
+    batch_parser.add_argument("--workers", type=int, help="工作进程数（默认CPU核心数）")
+    batch_parser.add_argument("--threads", action="store_true",
+                              help="使用线程代替进程，所有线程共用同一个字体索引")
+    batch_parser.add_argument("--resume", action="store_true",
+                              help="跳过上次中断的批量转换中已完成且未变化的文档")
+    batch_parser.add_argument("--fonts-dir", default="fonts", help="字体目录（默认fonts）")
+    batch_parser.add_argument("-q", "--quiet", action="store_true", help="不输出处理日志")
+    add_effect_arguments(batch_parser)
+    add_cache_arguments(batch_parser)
+    add_profile_arguments(batch_parser)
+    batch_parser.set_defaults(func=run_batch)
+
+    serve_parser = subparsers.add_parser("serve", help="启动本地HTTP转换服务")
+    serve_parser.add_argument("--host", default=DEFAULT_HOST, help=f"监听地址（默认{DEFAULT_HOST}）")
+    serve_parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"监听端口（默认{DEFAULT_PORT}）")
+    serve_parser.add_argument("--workers", type=int, help="工作进程数（默认CPU核心数）")
+    serve_parser.add_argument("--max-queue", type=int, default=DEFAULT_MAX_QUEUE,
+                              help=f"排队任务数上限（默认{DEFAULT_MAX_QUEUE}）")
+    serve_parser.add_argument("--work-dir", help="保存上传文档和转换结果的目录（默认临时目录）")
+    serve_parser.add_argument("--fonts-dir", default="fonts", help="字体目录（默认fonts）")
+    add_effect_arguments(serve_parser)
+    add_cache_arguments(serve_parser)
+    add_profile_arguments(serve_parser)
+    serve_parser.set_defaults(func=run_serve)
+
+    bench_parser = subparsers.add_parser("bench", help="以模拟文档和字体测量转换性能，结果输出为JSON")
+    bench_parser.add_argument("--paragraphs", type=int, default=200, help="正文段落数（默认200）")
+    bench_parser.add_argument("--chars", type=int, default=300, help="每个段落的字符数（默认300）")
+    bench_parser.add_argument("--table-ratio", type=float, default=0.1,
+                              help="每个段落前插入表格的概率（默认0.1）")
+    bench_parser.add_argument("--cjk-ratio", type=float, default=0.5, help="中文字符所占比例（默认0.5）")
+    bench_parser.add_argument("--fonts", type=int, default=10, help="模拟字体数量（默认10）")
+    bench_parser.add_argument("--repeat", type=int, default=3, help="每项测量重复次数，取最短耗时（默认3）")
+    bench_parser.add_argument("--seed", type=int, default=1, help="生成模拟数据和转换使用的随机种子（默认1）")
+    bench_parser.add_argument("--toggles", help=f"要测量的效果开关，逗号分隔（默认全部: {','.join(TOGGLES)}）")
+    bench_parser.add_argument("--output", help="将测量结果写入JSON文件（默认输出到屏幕）")
+    bench_parser.set_defaults(func=run_bench)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except Exception as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
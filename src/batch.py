@@ -0,0 +1,323 @@
+"""
+批量转换
+将目录或通配符匹配的多个文档分配到进程池中转换，
+字体索引在主进程加载一次后传给各工作进程，每个进程只接收一次；
+也可以使用线程池，所有线程共用同一个字体索引和转换器。
+
+每完成一个文档就更新输出目录中的检查点文件，批量转换中断（取消、出错或进程被终止）后
+以 resume=True 重新运行时，输入文档、选项和字体都未变化且输出文件仍存在的文档会直接跳过。
+"""
+
+import os
+import glob
+import json
+import time
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+try:
+    from .converter import ConversionCancelled, ConversionOptions, DocumentConverter, stats_to_dict
+    from .font_manager import FontManager
+    from .result_cache import DEFAULT_MAX_BYTES, ResultCache
+except ImportError:
+    from converter import ConversionCancelled, ConversionOptions, DocumentConverter, stats_to_dict
+    from font_manager import FontManager
+    from result_cache import DEFAULT_MAX_BYTES, ResultCache
+
+# 批量转换结果汇总文件名（保存在输出目录中）
+SUMMARY_FILENAME = "batch_summary.json"
+# 检查点文件名（保存在输出目录中）
+CHECKPOINT_FILENAME = "batch_checkpoint.json"
+# 进程池模式下检查取消事件的间隔（秒）
+CANCEL_POLL_SECONDS = 0.2
+
+# 工作进程内的字体管理器、转换选项与结果缓存（由_init_worker设置）
+_worker_font_manager = None
+_worker_options = None
+_worker_result_cache = None
+
+
+def _init_worker(font_manager, options, result_cache=None):
+    """工作进程初始化：保存字体索引、转换选项和结果缓存，供该进程处理的所有文档复用"""
+    global _worker_font_manager, _worker_options, _worker_result_cache
+    _worker_font_manager = font_manager
+    _worker_options = options
+    _worker_result_cache = result_cache
+
+
+def _convert_one(input_path, output_path, converter=None, cancel_event=None):
+    """
+    转换单个文档，返回该文档的结果摘要
+    未传入转换器时（工作进程中）使用_init_worker设置的字体索引和选项
+    """
+    result = {'input': input_path, 'output': output_path}
+    start = time.perf_counter()
+    try:
+        if converter is None:
+            converter = DocumentConverter(_worker_font_manager, _worker_options, log=lambda message: None,
+                                          result_cache=_worker_result_cache)
+        stats = converter.convert(input_path, output_path, cancel_event=cancel_event)
+        result['status'] = 'ok'
+        result['stats'] = stats_to_dict(stats)
+    except ConversionCancelled:
+        result['status'] = 'cancelled'
+    except Exception as e:
+        result['status'] = 'error'
+        result['error'] = str(e)
+    result['seconds'] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def _cancelled_result(input_path, output_path):
+    return {'input': input_path, 'output': output_path, 'status': 'cancelled', 'seconds': 0.0}
+
+
+class BatchCheckpoint:
+    """
+    批量转换的检查点
+    记录已完成的文档及其输入文件的大小和修改时间，选项或字体变化时之前的记录全部失效
+    """
+
+    def __init__(self, path, options, font_fingerprint):
+        """
+        Args:
+            path (str): 检查点文件路径
+            options (ConversionOptions): 转换选项
+            font_fingerprint (str): 字体集合的指纹（FontManager.get_fingerprint）
+        """
+        self.path = path
+        self.options = options.to_dict()
+        self.fonts = font_fingerprint
+        self.entries = {}  # 输入文档的绝对路径 -> {size, mtime, result}
+        if os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get('options') == self.options and data.get('fonts') == self.fonts:
+                    self.entries = data.get('files', {})
+            except (OSError, ValueError) as e:
+                print(f"读取检查点时出错，将重新转换所有文档: {e}")
+
+    def _signature(self, input_path):
+        stat = os.stat(input_path)
+        return stat.st_size, stat.st_mtime_ns
+
+    def completed(self, input_path, output_path):
+        """
+        获取已完成文档之前的结果
+
+        Returns:
+            dict or None: 输入未变化且输出仍存在时为之前的结果，否则为None
+        """
+        entry = self.entries.get(os.path.abspath(input_path))
+        if not entry or entry['result']['output'] != output_path or not os.path.exists(output_path):
+            return None
+        size, mtime = self._signature(input_path)
+        if entry['size'] != size or entry['mtime'] != mtime:
+            return None
+        return entry['result']
+
+    def record(self, result):
+        """记录一个成功转换的文档并立即写回磁盘"""
+        size, mtime = self._signature(result['input'])
+        self.entries[os.path.abspath(result['input'])] = {'size': size, 'mtime': mtime, 'result': result}
+        self.save()
+
+    def save(self):
+        data = {'options': self.options, 'fonts': self.fonts, 'files': self.entries}
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+
+def collect_inputs(source):
+    """
+    获取待转换的文档列表
+
+    Args:
+        source (str): 目录（转换其中所有.docx）或通配符，如 "in/**/*.docx"
+
+    Returns:
+        list: 排序后的文档路径
+    """
+    if os.path.isdir(source):
+        paths = glob.glob(os.path.join(source, "*.docx"))
+    else:
+        paths = glob.glob(source, recursive=True)
+    # 跳过Word打开文档时产生的临时文件
+    return sorted(path for path in paths if not os.path.basename(path).startswith("~$"))
+
+
+def source_root(source):
+    """
+    获取输入的根目录，输出文档按相对于它的路径保存
+
+    Args:
+        source (str): 目录或通配符
+
+    Returns:
+        str: 目录本身，或通配符中第一个含通配字符的部分之前的目录
+    """
+    if os.path.isdir(source):
+        return source
+    parts = []
+    for part in source.replace(os.sep, "/").split("/")[:-1]:
+        if any(char in part for char in "*?["):
+            break
+        parts.append(part)
+    return "/".join(parts) or "."
+
+
+def convert_batch(source, output_dir, options=None, fonts_dir="fonts", workers=None,
+                  font_manager=None, log=None, use_threads=False, cache_dir=None,
+                  cache_max_bytes=DEFAULT_MAX_BYTES, cancel_event=None, resume=False):
+    """
+    批量转换文档
+
+    Args:
+        source (str): 输入目录或通配符
+        output_dir (str): 输出目录，转换结果按输入文档相对于输入根目录的路径保存
+            （如 "in/**/*.docx" 匹配的 in/a/report.docx 保存为 output_dir/a/report.docx）
+        options (ConversionOptions): 转换选项
+        fonts_dir (str): 字体目录（未提供font_manager时使用）
+        workers (int): 工作进程数，None表示CPU核心数，1表示在当前进程中依次转换
+        font_manager (FontManager): 已加载的字体管理器
+        log (callable): 日志输出函数，默认print
+        use_threads (bool): 使用线程池代替进程池
+        cache_dir (str): 转换结果缓存目录，None表示不使用缓存（仅在指定了种子时生效）
+        cache_max_bytes (int): 转换结果缓存的大小上限（字节）
+        cancel_event (threading.Event): 设置后不再开始新的文档，正在转换的文档在下一个段落前停止
+        resume (bool): 跳过检查点中已完成且未变化的文档
+
+    Returns:
+        dict: 汇总信息，同时写入输出目录下的 batch_summary.json
+    """
+    log = log or print
+    options = options or ConversionOptions()
+    inputs = collect_inputs(source)
+    if not inputs:
+        raise ValueError(f"没有找到要转换的文档: {source}")
+
+    if font_manager is None:
+        font_manager = FontManager(fonts_dir)
+    if len(font_manager.font_files) < 2:
+        raise ValueError("至少需要2个字体文件才能实现字符级随机替换")
+
+    os.makedirs(output_dir, exist_ok=True)
+    root = source_root(source)
+    jobs = []
+    for input_path in inputs:
+        # 保留子目录结构，不同目录中的同名文档不会互相覆盖
+        output_path = os.path.join(output_dir, os.path.relpath(input_path, root))
+        if os.path.abspath(output_path) == os.path.abspath(input_path):
+            raise ValueError("输出目录不能与输入文档所在目录相同")
+        jobs.append((input_path, output_path))
+    for directory in {os.path.dirname(output_path) for _, output_path in jobs}:
+        os.makedirs(directory, exist_ok=True)
+
+    checkpoint = BatchCheckpoint(os.path.join(output_dir, CHECKPOINT_FILENAME), options,
+                                 font_manager.get_fingerprint())
+    results = []
+    if resume:
+        pending = []
+        for input_path, output_path in jobs:
+            previous = checkpoint.completed(input_path, output_path)
+            if previous is None:
+                pending.append((input_path, output_path))
+            else:
+                results.append(dict(previous, resumed=True))
+        if results:
+            log(f"根据检查点跳过 {len(results)} 个已完成的文档")
+        total = len(jobs)
+        jobs = pending
+    else:
+        total = len(jobs)
+
+    log(f"开始批量转换 {len(jobs)} 个文档...")
+    start = time.perf_counter()
+
+    def record(result):
+        results.append(result)
+        name = os.path.relpath(result['output'], output_dir)
+        if result['status'] == 'ok':
+            checkpoint.record(result)
+            log(f"[{len(results)}/{total}] {name}: 完成 "
+                f"({result['stats']['total_chars']} 个字符, {result['seconds']} 秒)")
+        elif result['status'] == 'cancelled':
+            log(f"[{len(results)}/{total}] {name}: 已取消")
+        else:
+            log(f"[{len(results)}/{total}] {name}: 失败 - {result['error']}")
+
+    def cancelled():
+        return cancel_event is not None and cancel_event.is_set()
+
+    # 转换器不保存转换状态，可在当前进程的多个线程中共用
+    result_cache = ResultCache(cache_dir, cache_max_bytes) if cache_dir else None
+    converter = DocumentConverter(font_manager, options, log=lambda message: None, result_cache=result_cache)
+    max_workers = max(1, min(workers or os.cpu_count() or 1, len(jobs)))
+    if max_workers == 1:
+        for input_path, output_path in jobs:
+            if cancelled():
+                record(_cancelled_result(input_path, output_path))
+            else:
+                record(_convert_one(input_path, output_path, converter, cancel_event))
+    else:
+        manager = None
+        if use_threads:
+            executor = ThreadPoolExecutor(max_workers=max_workers)
+            extra_args = (converter, cancel_event)
+        else:
+            if cancel_event is not None:
+                # threading.Event无法传入工作进程，改用Manager提供的共享事件，取消时同步设置
+                manager = multiprocessing.Manager()
+                shared_event = manager.Event()
+            executor = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                           initargs=(font_manager, options, result_cache))
+            extra_args = (None, shared_event if manager is not None else None)
+        # 每次只提交与工作者数量相同的文档（执行器会提前取走已提交的任务，无法再撤销），
+        # 取消后剩余的文档不再提交
+        queued = list(reversed(jobs))
+        running = set()
+        try:
+            with executor:
+                while queued or running:
+                    while queued and len(running) < max_workers and not cancelled():
+                        running.add(executor.submit(_convert_one, *queued.pop(), *extra_args))
+                    if cancelled():
+                        if manager is not None:
+                            shared_event.set()
+                        while queued:
+                            record(_cancelled_result(*queued.pop()))
+                    if not running:
+                        break
+                    done, running = wait(running, timeout=CANCEL_POLL_SECONDS, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        record(future.result())
+        finally:
+            if manager is not None:
+                manager.shutdown()
+
+    results.sort(key=lambda result: result['input'])
+    succeeded = [result for result in results if result['status'] == 'ok']
+    cancelled_count = sum(1 for result in results if result['status'] == 'cancelled')
+    summary = {
+        'total_files': len(results),
+        'succeeded': len(succeeded),
+        'failed': len(results) - len(succeeded) - cancelled_count,
+        'cancelled': cancelled_count,
+        'resumed': sum(1 for result in results if result.get('resumed')),
+        'total_chars': sum(result['stats']['total_chars'] for result in succeeded),
+        'cache_hits': sum(result['stats']['cache_hits'] for result in succeeded),
+        'cache_misses': sum(result['stats']['cache_misses'] for result in succeeded),
+        'seconds': round(time.perf_counter() - start, 3),
+        'options': options.to_dict(),
+        'files': results
+    }
+
+    with open(os.path.join(output_dir, SUMMARY_FILENAME), "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+
+    log(f"批量转换完成: 成功 {summary['succeeded']} 个（其中跳过 {summary['resumed']} 个），"
+        f"失败 {summary['failed']} 个，取消 {summary['cancelled']} 个，耗时 {summary['seconds']} 秒")
+    return summary
@@ -0,0 +1,369 @@
+"""
+内置基准测试
+按指定规模生成模拟文档（段落数、每段字符数、表格比例、中英文比例）和模拟字体，
+测量转换流程各环节的性能，结果以JSON输出，便于在版本之间比较：
+  - 字体加载：不使用覆盖缓存 / 使用覆盖缓存
+  - 逐字符字体查找
+  - 每种效果开关下的 文档加载、覆盖预检、逐字符属性计算、run生成、保存的耗时，
+    以及峰值内存和输出文件大小
+
+各环节耗时取自转换器自身的性能分析阶段（profiling.stage），与实际转换流程始终一致。
+
+峰值内存在独立的子进程中测量，各开关之间互不影响。
+"""
+
+import io
+import os
+import sys
+import time
+import random
+import shutil
+import platform
+import tempfile
+import tracemalloc
+import multiprocessing
+from contextlib import redirect_stdout
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict, replace
+
+from docx import Document
+from docx.shared import Pt
+from fontTools.fontBuilder import FontBuilder
+from fontTools.pens.ttGlyphPen import TTGlyphPen
+
+try:
+    import resource
+except ImportError:
+    # Windows没有resource模块
+    resource = None
+
+try:
+    from .converter import ConversionOptions, DocumentConverter
+    from .font_manager import FontManager
+    from .doc_walker import iter_paragraphs
+    from .char_streams import HAS_NUMPY
+except ImportError:
+    from converter import ConversionOptions, DocumentConverter
+    from font_manager import FontManager
+    from doc_walker import iter_paragraphs
+    from char_streams import HAS_NUMPY
+
+# 结果格式版本，字段变化时递增
+BENCHMARK_VERSION = 2
+
+# 效果开关：名称 -> 相对默认选项的修改
+TOGGLES = {
+    'default': {},
+    'no_handwriting': {'handwriting': False},
+    'no_line_spacing': {'random_line_spacing': False},
+    'no_char_size': {'random_char_size': False},
+    'no_indent': {'random_indent': False},
+    'merge_runs': {'merge_runs': True},
+    'scalar': {'vectorized': False},
+    'proxy_emitter': {'fast_emitter': False},
+    'streaming': {'streaming': True},
+}
+
+# 模拟文档使用的字符
+LATIN_CHARS = [chr(c) for c in range(0x41, 0x5B)] + [chr(c) for c in range(0x61, 0x7B)]
+CJK_CHARS = [chr(c) for c in range(0x4E00, 0x4E00 + 6000)]
+# 模拟字体覆盖的CJK区段
+CJK_BLOCK = (0x4E00, 0x9FFF)
+
+
+@dataclass
+class BenchmarkSpec:
+    """基准测试规模"""
+    paragraphs: int = 200  # 正文段落数（不含表格中的段落）
+    chars_per_paragraph: int = 300
+    table_ratio: float = 0.1  # 每个正文位置插入表格的概率
+    cjk_ratio: float = 0.5  # 中文字符所占比例
+    fonts: int = 10  # 模拟字体数量
+    cjk_font_ratio: float = 0.6  # 支持中文的字体所占比例
+    repeat: int = 3  # 每项测量重复次数，取最短耗时
+    seed: int = 1
+
+
+def synthesize_fonts(directory, spec, rng):
+    """
+    生成模拟字体：全部覆盖ASCII，部分覆盖CJK区段中随机的一段
+    所有码位映射到同一个空字形，文件很小但cmap与真实字体规模相当
+
+    Returns:
+        list: 字体文件路径
+    """
+    os.makedirs(directory, exist_ok=True)
+    glyph = TTGlyphPen(None).glyph()
+    paths = []
+    for i in range(spec.fonts):
+        cmap = {code: "g" for code in range(0x20, 0x7F)}
+        if rng.random() < spec.cjk_font_ratio:
+            start = rng.randrange(CJK_BLOCK[0], CJK_BLOCK[0] + 2000)
+            end = min(CJK_BLOCK[1], start + rng.randrange(3000, 20000))
+            cmap.update((code, "g") for code in range(start, end))
+
+        name = f"Bench{i:02d}"
+        builder = FontBuilder(1000, isTTF=True)
+        builder.setupGlyphOrder([".notdef", "g"])
+        builder.setupCharacterMap(cmap)
+        builder.setupGlyf({".notdef": glyph, "g": glyph})
+        builder.setupHorizontalMetrics({".notdef": (500, 0), "g": (500, 0)})
+        builder.setupHorizontalHeader(ascent=800, descent=-200)
+        builder.setupNameTable({"familyName": name, "styleName": "Regular"})
+        builder.setupOS2()
+        builder.setupPost()
+        path = os.path.join(directory, f"{name}.ttf")
+        builder.save(path)
+        paths.append(path)
+    return paths
+
+
+def _random_text(count, spec, rng):
+    return "".join(rng.choice(CJK_CHARS) if rng.random() < spec.cjk_ratio else rng.choice(LATIN_CHARS)
+                   for _ in range(count))
+
+
+def _add_runs(paragraph, count, spec, rng):
+    """在段落中添加1-3个run，部分带原始字号和粗体"""
+    cuts = sorted(rng.sample(range(1, count), min(count - 1, rng.randint(0, 2))))
+    bounds = [0] + cuts + [count]
+    for start, end in zip(bounds, bounds[1:]):
+        run = paragraph.add_run(_random_text(end - start, spec, rng))
+        if rng.random() < 0.8:
+            run.font.size = Pt(rng.choice([10.5, 12, 14]))
+        if rng.random() < 0.2:
+            run.bold = True
+
+
+def synthesize_document(path, spec, rng):
+    """
+    生成模拟文档：正文段落中按table_ratio穿插2x3的表格，
+    每个单元格一个段落，字符数为正文段落的六分之一
+
+    Returns:
+        int: 文档中的字符总数
+    """
+    document = Document()
+    cell_chars = max(2, spec.chars_per_paragraph // 6)
+    total = 0
+    for _ in range(spec.paragraphs):
+        if rng.random() < spec.table_ratio:
+            table = document.add_table(rows=2, cols=3)
+            for cell in (cell for row in table.rows for cell in row.cells):
+                _add_runs(cell.paragraphs[0], cell_chars, spec, rng)
+                total += cell_chars
+        _add_runs(document.add_paragraph(), spec.chars_per_paragraph, spec, rng)
+        total += spec.chars_per_paragraph
+    document.save(path)
+    return total
+
+
+# 结果字段 -> 性能分析阶段
+STAGE_FIELDS = {
+    'load_seconds': 'load',
+    'coverage_seconds': 'coverage',
+    'attribute_seconds': 'attributes',
+    'emission_seconds': 'emission',
+    'save_seconds': 'save',
+}
+
+
+def _max_rss_bytes():
+    """当前进程的常驻内存峰值（字节），无法获取时为None"""
+    try:
+        # Linux的VmHWM只统计当前进程映像，不继承启动子进程的父进程的峰值
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS以字节为单位，其余系统以KB为单位
+    return usage if sys.platform == "darwin" else usage * 1024
+
+
+def _measure_memory(font_manager, options, input_path, output_path):
+    """
+    在子进程中转换一次，返回峰值内存
+    能获取进程常驻内存时报告常驻内存（含lxml等C扩展的分配），
+    否则以tracemalloc报告Python堆的峰值
+    """
+    converter = DocumentConverter(font_manager, options, log=lambda message: None)
+    rss_before = _max_rss_bytes()
+    if rss_before is None:
+        tracemalloc.start()
+        converter.convert(input_path, output_path)
+        _, python_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return {'peak_rss_bytes': None, 'peak_rss_growth_bytes': None, 'peak_python_heap_bytes': python_peak}
+
+    converter.convert(input_path, output_path)
+    rss_after = _max_rss_bytes()
+    return {
+        'peak_rss_bytes': rss_after,
+        'peak_rss_growth_bytes': rss_after - rss_before,
+        'peak_python_heap_bytes': None
+    }
+
+
+def bench_font_loading(fonts_dir, repeat):
+    """字体加载耗时：不使用覆盖缓存 / 使用覆盖缓存"""
+    cold = min(_timed(lambda: FontManager(fonts_dir, use_cache=False, workers=1))[0] for _ in range(repeat))
+    FontManager(fonts_dir, use_cache=True, workers=1)  # 写入覆盖缓存
+    warm_seconds, font_manager = min((_timed(lambda: FontManager(fonts_dir, use_cache=True, workers=1))
+                                      for _ in range(repeat)), key=lambda result: result[0])
+    return font_manager, {
+        'fonts': len(font_manager.font_files),
+        'cold_seconds': round(cold, 4),
+        'cached_seconds': round(warm_seconds, 4),
+        'index_segments': len(font_manager.coverage_index),
+        'memory_bytes': font_manager.get_memory_usage()
+    }
+
+
+def bench_lookup(font_manager, text, repeat):
+    """逐字符字体查找耗时"""
+    rng = random.Random(0)
+    lookup = font_manager.get_font_for_char
+
+    def run():
+        for char in text:
+            lookup(char, rng)
+
+    seconds = min(_timed(run)[0] for _ in range(repeat))
+    return {
+        'chars': len(text),
+        'seconds': round(seconds, 4),
+        'ns_per_char': round(seconds / max(1, len(text)) * 1e9, 1)
+    }
+
+
+def _timed(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+def bench_toggle(font_manager, options, input_path, output_path, repeat):
+    """一种效果开关下的转换耗时、峰值内存和输出大小"""
+    # 只记录阶段耗时，不启用逐函数和内存分析
+    profiled = replace(options, profile=True, profile_functions=False, profile_memory=False)
+    converter = DocumentConverter(font_manager, profiled, log=lambda message: None)
+    best = None
+    for _ in range(repeat):
+        seconds, stats = _timed(lambda: converter.convert(input_path, output_path))
+        if best is None or seconds < best[0]:
+            best = seconds, stats
+
+    seconds, stats = best
+    stages = stats['profile']['stages']
+    result = {'total_seconds': round(seconds, 4)}
+    for name, stage_name in STAGE_FIELDS.items():
+        # 流式模式边解析边写出，加载和保存无法分开计时；未启用覆盖预检时没有coverage阶段
+        result[name] = round(stages[stage_name]['seconds'], 4) if stage_name in stages else None
+    result['chars_per_second'] = round(stats['total_chars'] / seconds) if seconds else None
+    result['runs_created'] = stats['runs_created']
+    result['output_bytes'] = os.path.getsize(output_path)
+
+    # 每个开关使用新启动的子进程（不继承当前进程的内存峰值），峰值内存不受之前转换的影响
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        result.update(executor.submit(_measure_memory, font_manager, options,
+                                      input_path, output_path).result())
+    return result
+
+
+def run_benchmark(spec=None, toggles=None, base_options=None, log=None):
+    """
+    运行基准测试
+
+    Args:
+        spec (BenchmarkSpec): 模拟文档和字体的规模
+        toggles (list): 要测量的效果开关名称，None表示TOGGLES中的全部
+        base_options (ConversionOptions): 各开关共用的基础选项
+        log (callable): 日志输出函数，默认print
+
+    Returns:
+        dict: 可JSON序列化的测量结果
+    """
+    spec = spec or BenchmarkSpec()
+    toggles = list(toggles or TOGGLES)
+    unknown = [name for name in toggles if name not in TOGGLES]
+    if unknown:
+        raise ValueError(f"未知的效果开关: {', '.join(unknown)}")
+    base_options = replace(base_options or ConversionOptions(), seed=spec.seed, paragraph_workers=1)
+    log = log or print
+
+    rng = random.Random(spec.seed)
+    work_dir = tempfile.mkdtemp(prefix="font_randomizer_bench_")
+    try:
+        fonts_dir = os.path.join(work_dir, "fonts")
+        input_path = os.path.join(work_dir, "input.docx")
+        output_path = os.path.join(work_dir, "output.docx")
+
+        log(f"生成 {spec.fonts} 个模拟字体和 {spec.paragraphs} 个段落的模拟文档...")
+        synthesize_fonts(fonts_dir, spec, rng)
+        total_chars = synthesize_document(input_path, spec, rng)
+
+        log("测量字体加载...")
+        # 字体加载时逐个输出信息，测量期间不显示
+        with redirect_stdout(io.StringIO()):
+            font_manager, font_loading = bench_font_loading(fonts_dir, spec.repeat)
+
+        log("测量逐字符字体查找...")
+        text = "".join(paragraph.text for paragraph in iter_paragraphs(Document(input_path).element.body))
+        lookup = bench_lookup(font_manager, text, spec.repeat)
+
+        runs = {}
+        for name in toggles:
+            log(f"测量效果开关: {name}")
+            options = replace(base_options, **TOGGLES[name])
+            runs[name] = bench_toggle(font_manager, options, input_path, output_path, spec.repeat)
+
+        return {
+            'version': BENCHMARK_VERSION,
+            'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"),
+            'environment': {
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpu_count': os.cpu_count(),
+                'numpy': HAS_NUMPY
+            },
+            'spec': asdict(spec),
+            'document': {
+                'chars': total_chars,
+                'input_bytes': os.path.getsize(input_path)
+            },
+            'base_options': base_options.to_dict(),
+            'font_loading': font_loading,
+            'lookup': lookup,
+            'runs': runs
+        }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def format_summary(results):
+    """将测量结果整理为便于阅读的表格文本"""
+    loading = results['font_loading']
+    lookup = results['lookup']
+    lines = [
+        f"文档: {results['document']['chars']} 个字符, {results['document']['input_bytes'] / 1024:.0f} KB",
+        f"字体加载: 无缓存 {loading['cold_seconds']} 秒, 使用缓存 {loading['cached_seconds']} 秒",
+        f"字体查找: {lookup['ns_per_char']} ns/字符",
+        f"{'开关':<16}{'总计':>8}{'加载':>8}{'预检':>8}{'属性':>8}{'run':>8}{'保存':>8}{'内存MB':>9}{'输出KB':>9}"
+    ]
+
+    def cell(value, width):
+        return f"{'-':>{width}}" if value is None else f"{value:>{width}.3f}"
+
+    for name, run in results['runs'].items():
+        peak = run['peak_rss_growth_bytes'] if run['peak_rss_growth_bytes'] is not None \
+            else run['peak_python_heap_bytes']
+        lines.append(f"{name:<18}{cell(run['total_seconds'], 8)}{cell(run['load_seconds'], 8)}"
+                     f"{cell(run['coverage_seconds'], 8)}{cell(run['attribute_seconds'], 8)}{cell(run['emission_seconds'], 8)}"
+                     f"{cell(run['save_seconds'], 8)}{peak / (1024 * 1024):>9.1f}"
+                     f"{run['output_bytes'] / 1024:>9.0f}")
+    return "\n".join(lines)
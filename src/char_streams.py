@@ -0,0 +1,277 @@
+"""
+逐字符属性的批量生成
+以NumPy一次性生成整个段落每个字符的字体、字号、倾斜和位置，
+代替逐字符调用 get_font_for_char / _get_random_char_size /
+_get_random_char_position / HandwritingSimulator.get_char_tilt。
+
+生成规则与逐字符实现一致：
+  - 字号和位置为有界随机游走，每步在±0.5磅内，越界时在边界处反射，
+    反射不会放大步长，因此相邻字符的差距仍不超过0.5磅；字号在原始字号不同的run之间
+    从前一个字符的实际字号接续，前一个字号在新范围之外时每步最多0.5磅地向新范围靠拢
+  - 倾斜按趋势分段：每段持续8-25个字符，到第10-20个字符时可能提前开始新趋势，
+    段内由0平滑过渡到目标倾斜，并叠加±0.2度的微颤
+  - 字体从覆盖索引中支持该字符的字体里等概率选择（覆盖索引展开为数组批量查找）
+
+NumPy为可选依赖，未安装时 HAS_NUMPY 为False，转换器使用逐字符实现。
+"""
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+HAS_NUMPY = np is not None
+
+# 字符高度位置范围（磅）与相邻字符的最大落差
+POSITION_LIMIT = 2.5
+MAX_STEP = 0.5
+# 最小字号（磅）
+MIN_CHAR_SIZE = 6
+# 倾斜趋势的持续字符数、提前结束的字符数范围，以及平滑过渡的字符数
+TREND_DURATION = (8, 25)
+TREND_RESTART = (10, 20)
+TREND_EASE_CHARS = 15.0
+
+
+# 每次预先抽取的均匀随机数个数（整个转换共用一个生成器 / 每个段落重新设置种子时）
+RANDOM_POOL_SIZE = 1 << 16
+PARAGRAPH_POOL_SIZE = 1 << 10
+
+
+class RandomPool:
+    """
+    预先批量抽取[0, 1)均匀随机数，按需切片取用
+    短段落只需要几十个随机数，逐次调用Generator的固定开销远大于抽取本身
+    """
+
+    def __init__(self, generator, size=RANDOM_POOL_SIZE):
+        self.generator = generator
+        self.size = size
+        self.buffer = generator.random(size)
+        self.position = 0
+
+    def take(self, count):
+        """取出count个均匀随机数"""
+        if self.position + count > len(self.buffer):
+            self.buffer = self.generator.random(max(self.size, count))
+            self.position = 0
+        values = self.buffer[self.position:self.position + count]
+        self.position += count
+        return values
+
+
+def reflect_into(values, low, high):
+    """将数值反射到[low, high]区间内（1-Lipschitz，不会放大相邻差距）"""
+    width = np.maximum(high - low, 1e-9)  # 区间退化为一点时结果即low
+    folded = np.mod(values - low, 2 * width)
+    return low + width - np.abs(folded - width)
+
+
+def bounded_walk(pool, count, low, high, previous=None):
+    """
+    在[low, high]内的随机游走，首个值在区间内均匀分布，之后每步±MAX_STEP
+    low可以是标量或长度为count的数组，high为标量；
+    指定previous时接续之前的游走：首个值为previous走一步后限制在区间内
+    """
+    uniform = pool.take(count)
+    steps = (uniform - 0.5) * (2 * MAX_STEP)
+    first_low = low if np.isscalar(low) else low[0]
+    if previous is None:
+        steps[0] = first_low + uniform[0] * (high - first_low)
+    else:
+        steps[0] = min(max(previous + steps[0], first_low), high)
+    return reflect_into(np.cumsum(steps), low, high)
+
+
+def follow_from(values, previous):
+    """
+    从previous出发追赶游走values，每步最多MAX_STEP，追上后与values一致（原地修改）
+    只在追赶阶段逐个处理，通常只涉及开头几个字符
+    """
+    for i in range(len(values)):
+        value = min(max(values[i], previous - MAX_STEP), previous + MAX_STEP)
+        if value == values[i]:
+            break
+        values[i] = previous = value
+    return values
+
+
+def _quantize(half_points, bucket):
+    """量化到bucket半磅的整数倍（与DocumentConverter._quantize_run_key一致）"""
+    if bucket > 1:
+        half_points = np.round(half_points / bucket).astype(int) * bucket
+    return half_points
+
+
+def _to_half_points(values, bucket=1):
+    """磅值转换为半磅整数列表，绝对值小于0.1的偏移为None（与逐字符实现一致）"""
+    # 转为对象数组后按掩码置None，整体转换为列表，不逐个字符处理
+    half_points = _quantize(np.trunc(values * 2).astype(int), bucket).astype(object)
+    half_points[np.abs(values) < 0.1] = None
+    return half_points.tolist()
+
+
+class CharStreams:
+    """一个段落逐字符的属性数组"""
+
+    __slots__ = ('fonts', 'sizes', 'tilts', 'positions', 'size_points',
+                 'position_points', 'random_size_count', 'last_trend_length')
+
+    def __init__(self):
+        self.fonts = []  # 字体名称，None表示没有支持该字符的字体
+        self.sizes = []  # 字号（半磅），None表示不设置
+        self.tilts = []  # 倾斜位置偏移（半磅），None表示不偏移
+        self.positions = []  # 高度位置偏移（半磅），None表示不偏移
+        self.size_points = None  # 随机字号（磅），仅含设置了字号的字符
+        self.position_points = None  # 高度位置（磅）
+        self.random_size_count = 0
+        self.last_trend_length = 0  # 最后一个倾斜趋势已持续的字符数
+
+
+class StreamGenerator:
+    """
+    段落属性批量生成器
+    每次转换创建一个，随机数由转换任务的随机数生成器派生，指定种子时结果可重现；
+    启用run合并时字号、倾斜和位置直接按合并档位量化，属性相同的相邻字符可以直接分组
+    """
+
+    def __init__(self, font_manager, settings, rng):
+        if not HAS_NUMPY:
+            raise ImportError("批量生成需要安装numpy")
+        self.font_manager = font_manager
+        self.settings = settings
+        self.pool = RandomPool(np.random.default_rng(rng.getrandbits(64)))
+        self.bucket = max(1, int(round(settings['merge_step'] * 2))) if settings['merge_runs'] else 1
+        self._build_font_tables(font_manager.coverage_index)
+
+    def reseed(self, rng):
+        """以新的随机数生成器派生种子（段落并行时每个段落调用一次）"""
+        self.pool = RandomPool(np.random.default_rng(rng.getrandbits(64)), PARAGRAPH_POOL_SIZE)
+
+    def _build_font_tables(self, index):
+        """
+        将覆盖索引展开为数组，按码位批量查找字体
+        分段0表示第一个区间之前（没有字体），字体以编号存储，编号0表示None
+        """
+        names = [None]
+        font_ids = {}
+        flat = []
+        counts = [0]
+        for fonts in index.fonts:
+            for name in fonts:
+                if name not in font_ids:
+                    font_ids[name] = len(names)
+                    names.append(name)
+                flat.append(font_ids[name])
+            counts.append(len(fonts))
+        self._starts = np.asarray(index.starts, dtype=np.int64)
+        self._counts = np.asarray(counts, dtype=np.int64)
+        self._offsets = np.concatenate(([0], np.cumsum(self._counts)[:-1]))
+        self._flat_ids = np.asarray(flat + [0], dtype=np.int64)
+        self._names = np.asarray(names, dtype=object)
+
+    def generate(self, pieces):
+        """
+        生成一个段落的逐字符属性
+
+        Args:
+            pieces (list): [(文本, 原始字号磅值或None), ...]，按段落中的顺序
+
+        Returns:
+            CharStreams
+        """
+        streams = CharStreams()
+        text = "".join(piece_text for piece_text, _ in pieces)
+        count = len(text)
+        if not count:
+            return streams
+
+        streams.fonts = self._pick_fonts(text)
+        self._generate_sizes(pieces, count, streams)
+
+        if self.settings['handwriting']:
+            tilt_angles, streams.last_trend_length = self._generate_tilts(count)
+            streams.tilts = _to_half_points(tilt_angles * self.settings['max_tilt_multiplier'], self.bucket)
+        else:
+            streams.tilts = [None] * count
+
+        streams.position_points = bounded_walk(self.pool, count, -POSITION_LIMIT, POSITION_LIMIT)
+        streams.positions = _to_half_points(streams.position_points, self.bucket)
+        return streams
+
+    def _pick_fonts(self, text):
+        """为每个字符从支持它的字体中随机选择一个"""
+        codes = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+        segments = np.searchsorted(self._starts, codes, side='right')
+        counts = self._counts[segments]
+        picks = self._offsets[segments] + (self.pool.take(len(codes)) * counts).astype(np.int64)
+        font_ids = np.where(counts > 0, self._flat_ids[np.minimum(picks, len(self._flat_ids) - 1)], 0)
+        return self._names[font_ids].tolist()
+
+    def _generate_sizes(self, pieces, count, streams):
+        """字号：有原始字号的字符在 原始字号±范围 内随机游走，否则不设置"""
+        base = np.concatenate([np.full(len(piece_text), size if size else np.nan)
+                               for piece_text, size in pieces])
+        sized = np.flatnonzero(~np.isnan(base))
+        if len(sized) and self.settings['random_char_size']:
+            size_range = self.settings['char_size_range']
+            base_sized = base[sized]
+            # 原始字号相同的连续字符为一段，在相对原始字号的偏移上游走；
+            # 后一段从前一个字符的实际字号接续，相邻字符的差距在run之间同样不超过MAX_STEP
+            size_points = []
+            previous = None
+            for segment in np.split(base_sized, np.flatnonzero(np.diff(base_sized)) + 1):
+                segment_base = segment[0]
+                low = min(max(MIN_CHAR_SIZE, segment_base - size_range) - segment_base, size_range)
+                offsets = bounded_walk(self.pool, len(segment), low, size_range,
+                                       None if previous is None else previous - segment_base)
+                points = segment_base + offsets
+                if previous is not None:
+                    follow_from(points, previous)
+                previous = points[-1]
+                size_points.append(points)
+            streams.size_points = np.concatenate(size_points)
+            streams.random_size_count = len(sized)
+            values = np.trunc(streams.size_points * 2).astype(int)
+        else:
+            values = np.trunc(base[sized] * 2).astype(int)
+        sizes = np.full(count, None, dtype=object)
+        sizes[sized] = _quantize(values, self.bucket).astype(object)
+        streams.sizes = sizes.tolist()
+
+    def _generate_tilts(self, count):
+        """
+        手写倾斜（度）
+
+        Returns:
+            tuple: (逐字符倾斜角度数组, 最后一个趋势已持续的字符数)
+        """
+        # 每个趋势至少持续TREND_DURATION[0]个字符，按此预先抽取足够多的趋势
+        capacity = count // TREND_DURATION[0] + 1
+        restart_at = np.arange(TREND_RESTART[0], TREND_RESTART[1] + 1)
+        uniform = self.pool.take(capacity * (3 + len(restart_at)) + count)
+        trend_uniform = uniform[:capacity * 3].reshape(3, capacity)
+        threshold_uniform = uniform[capacity * 3:-count].reshape(capacity, len(restart_at))
+        tremor = (uniform[-count:] - 0.5) * 0.4  # ±0.2度微颤
+
+        duration_span = TREND_DURATION[1] - TREND_DURATION[0] + 1
+        durations = TREND_DURATION[0] + (trend_uniform[0] * duration_span).astype(int)
+        directions = np.where(trend_uniform[1] < 0.5, -1.0, 1.0)
+        targets = directions * (0.8 + 0.7 * trend_uniform[2])
+
+        # 第c个字符（c从TREND_RESTART[0]开始）前随机抽取阈值，c不小于阈值时开始新趋势
+        thresholds = TREND_RESTART[0] + (threshold_uniform * len(restart_at)).astype(int)
+        first_restart = restart_at[np.argmax(restart_at >= thresholds, axis=1)]
+        lengths = np.minimum(durations, first_restart)
+
+        ends = np.cumsum(lengths)
+        trend_count = int(np.searchsorted(ends, count)) + 1
+        starts = ends[:trend_count] - lengths[:trend_count]
+        trend = np.repeat(np.arange(trend_count), lengths[:trend_count])[:count]
+        offset = np.arange(count) - starts[trend]
+
+        # 段内由0缓动到目标倾斜（与HandwritingSimulator._ease_in_out一致）
+        progress = np.minimum((durations[trend] - offset) / TREND_EASE_CHARS, 1.0)
+        eased = progress * progress * (3 - 2 * progress)
+        tilts = targets[trend] * eased + tremor
+        return tilts, int(count - starts[-1])
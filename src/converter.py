@@ -0,0 +1,791 @@
+"""
+文档转换引擎
+不依赖图形界面的字符级字体随机替换实现，GUI、命令行和包接口共用
+"""
+
+import os
+import random
+from itertools import groupby, repeat
+from operator import itemgetter
+from dataclasses import dataclass, asdict
+from typing import Optional
+from docx import Document
+from docx.oxml import OxmlElement
+from docx.oxml.parser import parse_xml
+from docx.text.paragraph import Paragraph
+from lxml import etree
+
+try:
+    from .font_manager import FontManager
+    from .font_coverage import CandidateMemo
+    from .run_emitter import RunEmitter, add_styled_run
+    from .streaming import collect_package_chars, stream_convert_package
+    from .doc_walker import count_text, distinct_chars, iter_paragraphs, iter_story_parts
+    from .char_streams import HAS_NUMPY, StreamGenerator
+    from .paragraph_pool import PARALLEL_BATCH_BLOCKS, ParagraphPool
+    from .package_io import DEFAULT_COMPRESS_LEVEL, PARTIAL_SUFFIX, save_document
+    from .result_cache import DEFAULT_MAX_BYTES, ResultCache
+    from .profiling import Profiler, stage, write_sidecar
+    from .coverage_plan import (COVERAGE_ABORT, COVERAGE_FALLBACK, COVERAGE_OFF, COVERAGE_POLICIES,
+                                 CoverageError, CoveragePlan, format_coverage)
+except ImportError:
+    from font_manager import FontManager
+    from font_coverage import CandidateMemo
+    from run_emitter import RunEmitter, add_styled_run
+    from streaming import collect_package_chars, stream_convert_package
+    from doc_walker import count_text, distinct_chars, iter_paragraphs, iter_story_parts
+    from char_streams import HAS_NUMPY, StreamGenerator
+    from paragraph_pool import PARALLEL_BATCH_BLOCKS, ParagraphPool
+    from package_io import DEFAULT_COMPRESS_LEVEL, PARTIAL_SUFFIX, save_document
+    from result_cache import DEFAULT_MAX_BYTES, ResultCache
+    from profiling import Profiler, stage, write_sidecar
+    from coverage_plan import (COVERAGE_ABORT, COVERAGE_FALLBACK, COVERAGE_OFF, COVERAGE_POLICIES,
+                               CoverageError, CoveragePlan, format_coverage)
+
+# 合并run时字号和位置的量化档位（磅），0.5磅即Word的半磅精度
+RUN_MERGE_STEP = 0.5
+
+class HandwritingSimulator:
+    """手写模拟器 - 模拟真实手写的倾斜和纠正模式"""
+    
+    def __init__(self, rng=None):
+        self.rng = rng or random  # 随机数生成器，None使用全局random
+        self.current_tilt = 0  # 当前倾斜度
+        self.char_count_since_correction = 0  # 自上次纠正后的字符数
+        self.current_trend_duration = 0  # 当前趋势持续时间
+        self.target_tilt = 0  # 目标倾斜度
+        self.trend_direction = 0  # 趋势方向 (1: 向上, -1: 向下)
+        
+    def get_char_tilt(self, char):
+        """
+        为字符计算倾斜度
+        返回: 倾斜角度（度数）
+        """
+        # 每10-20个字符开始新的倾斜趋势
+        if (self.char_count_since_correction >= 
+            self.rng.randint(10, 20) or 
+            self.current_trend_duration <= 0):
+            
+            # 开始新的倾斜趋势
+            self._start_new_trend()
+        
+        # 计算当前倾斜度（平滑过渡到目标倾斜）
+        progress = min(1.0, self.current_trend_duration / 15.0)
+        current_tilt = self._ease_in_out(progress, self.current_tilt, self.target_tilt)
+        
+        # 更新状态
+        self.char_count_since_correction += 1
+        self.current_trend_duration -= 1
+        
+        # 轻微随机扰动（模拟手部微颤）
+        micro_tremor = self.rng.uniform(-0.2, 0.2)
+        
+        return current_tilt + micro_tremor
+    
+    def _start_new_trend(self):
+        """开始新的倾斜趋势"""
+        # 重置计数器
+        self.char_count_since_correction = 0
+        self.current_trend_duration = self.rng.randint(8, 25)  # 趋势持续时间
+        
+        # 决定新的倾斜方向（70%概率改变方向，30%概率继续当前方向）
+        if self.rng.random() < 0.7 or abs(self.current_tilt) < 0.5:
+            self.trend_direction = self.rng.choice([-1, 1])
+        else:
+            # 继续当前方向但可能减弱
+            self.trend_direction = 1 if self.current_tilt > 0 else -1
+        
+        # 设置目标倾斜度（轻微倾斜，最大1.5度）
+        max_tilt = self.rng.uniform(0.8, 1.5)
+        self.target_tilt = self.trend_direction * max_tilt
+        
+        # 如果当前倾斜度与目标方向相反，先快速纠正
+        if (self.current_tilt * self.target_tilt) < 0:
+            # 方向相反，先快速回归基线
+            correction_duration = self.rng.randint(3, 8)
+            self.current_trend_duration = correction_duration
+            self.target_tilt = 0  # 先回归基线
+            
+        # 更新当前倾斜度为起始点
+        self.current_tilt = self.current_tilt
+    
+    def _ease_in_out(self, t, start, end):
+        """缓动函数，使倾斜变化更自然"""
+        # 三次缓动函数
+        t = max(0, min(1, t))
+        t2 = t * t
+        t3 = t2 * t
+        return start + (end - start) * (-2 * t3 + 3 * t2)
+
+class LineSpacingManager:
+    """行间距管理器 - 实现每两行之间的随机间距"""
+    
+    def __init__(self, rng=None):
+        self.rng = rng or random  # 随机数生成器，None使用全局random
+        self.line_spacing_cache = {}  # 缓存已设置的行间距
+        
+    def get_random_line_spacing(self, line_index):
+        """
+        为指定行获取随机行间距
+        返回: 行间距倍数 (0.8~1.2之间)
+        """
+        # 如果已经为这行设置过间距，则返回缓存值
+        if line_index in self.line_spacing_cache:
+            return self.line_spacing_cache[line_index]
+        
+        # 生成随机行间距
+        spacing = self.rng.uniform(0.8, 1.2)
+        self.line_spacing_cache[line_index] = spacing
+        return spacing
+
+@dataclass
+class ConversionOptions:
+    """
+    转换选项
+    各项力度取值1-5，与界面上的滑块一致
+    """
+    handwriting: bool = True  # 手写模拟效果
+    handwriting_strength: int = 3
+    random_line_spacing: bool = True  # 随机行间距
+    line_spacing_strength: int = 3
+    random_char_size: bool = True  # 随机字符大小
+    char_size_strength: int = 3
+    random_indent: bool = True  # 随机行首缩进
+    indent_strength: int = 3
+    merge_runs: bool = False  # 合并属性相同的相邻字符
+    merge_step: float = RUN_MERGE_STEP  # 合并时字号和位置的量化档位（磅）
+    fast_emitter: bool = True  # 直接以lxml构建run
+    streaming: bool = False  # 流式改写正文，不加载整个文档
+    compress_level: int = DEFAULT_COMPRESS_LEVEL  # 重新写入部件的压缩级别（0-9）
+    vectorized: bool = True  # 以NumPy整段批量生成逐字符属性（需要numpy）
+    paragraph_workers: int = 1  # 段落并行的进程数，1表示不并行，0表示CPU核心数
+    seed: Optional[int] = None  # 随机种子，相同的种子、文档和字体得到相同的结果
+    profile: bool = False  # 记录各阶段耗时，写入统计信息和<输出文件>.profile.json
+    profile_functions: bool = False  # 性能分析时以cProfile记录逐函数耗时
+    profile_memory: bool = False  # 性能分析时以tracemalloc记录各阶段内存峰值
+    coverage_policy: str = COVERAGE_OFF  # 字形覆盖预检：off / report / abort / fallback
+    fallback_font: Optional[str] = None  # 策略为fallback时，没有字体支持的字符使用的字体
+    
+    def to_dict(self):
+        """转换为普通字典"""
+        return asdict(self)
+    
+    def to_settings(self):
+        """根据力度计算本次转换使用的具体参数"""
+        return {
+            'handwriting': self.handwriting,
+            'max_tilt_multiplier': 0.5 + (self.handwriting_strength * 0.3),  # 1.0-2.0倍倾斜
+            'random_line_spacing': self.random_line_spacing,
+            'line_spacing_min': 0.9 - (self.line_spacing_strength * 0.1),  # 0.8-0.5
+            'line_spacing_max': 1.1 + (self.line_spacing_strength * 0.1),  # 1.2-1.6
+            'random_char_size': self.random_char_size,
+            'char_size_range': 0.3 + (self.char_size_strength * 0.3),  # 0.6-1.8
+            'random_indent': self.random_indent,
+            'indent_min': 1,  # 最少1个空格
+            'indent_max': min(5, 1 + self.indent_strength),  # 最多1+力度值个空格，最大5个
+            'merge_runs': self.merge_runs,
+            'merge_step': self.merge_step
+        }
+
+def new_stats():
+    """创建空的统计信息"""
+    return {
+        'total_chars': 0,
+        'chars_with_font': 0,
+        'chars_without_font': 0,
+        'chars_with_fallback': 0,
+        'used_fonts': set(),
+        'handwriting_trends': 0,
+        'lines_with_random_spacing': 0,
+        'chars_with_random_size': 0,
+        'lines_with_random_indent': 0,
+        'runs_created': 0,
+        'run_reduction_ratio': 1.0,
+        'cache_hits': 0,
+        'cache_misses': 0,
+        'candidate_memo_hits': 0,
+        'candidate_memo_misses': 0,
+        'candidate_memo_hit_rate': None,
+        'font_lookup': None  # memo: 逐字符经候选字体缓存查找；vectorized: NumPy整段批量查找，不经过缓存
+    }
+
+def merge_stats(total, part):
+    """将part中的计数累加到total"""
+    for key, value in part.items():
+        if key == 'used_fonts':
+            total[key].update(value)
+        elif key not in ('run_reduction_ratio', 'candidate_memo_hit_rate', 'font_lookup'):
+            total[key] += value
+
+def stats_to_dict(stats):
+    """将统计信息转换为可JSON序列化的字典"""
+    result = dict(stats)
+    result['used_fonts'] = sorted(stats['used_fonts'])
+    return result
+
+class ConversionCancelled(Exception):
+    """转换被取消（取消事件在处理段落之间被检查到）"""
+
+class ConversionJob:
+    """
+    一次转换的全部可变状态
+    随机数生成器、统计信息、逐字符的随机游走状态和run模板缓存都保存在这里，
+    DocumentConverter本身只读，可在多个线程中同时执行转换并共用同一个字体索引
+    """
+    
+    def __init__(self, font_manager, options):
+        self.options = options
+        self.settings = options.to_settings()  # 本次转换使用的具体参数
+        self.rng = random.Random(options.seed)  # 本次转换使用的随机数生成器
+        self.stats = new_stats()
+        
+        # 字符高度控制
+        self.last_char_position = None  # 上一个字符的垂直位置
+        
+        # 快速模式下直接以lxml构建run
+        self.emitter = RunEmitter() if options.fast_emitter else None
+        
+        # 启用批量生成且安装了numpy时，整段一次生成逐字符属性
+        self.stream_generator = None
+        if options.vectorized and HAS_NUMPY:
+            self.stream_generator = StreamGenerator(font_manager, self.settings, self.rng)
+        
+        # 段落并行使用的进程池（仅在转换期间存在）
+        self.paragraph_pool = None
+        
+        # 性能分析记录（启用性能分析时由转换器设置）
+        self.profiler = None
+        
+        # 进度通道（ProgressReporter，由调用方提供）
+        self.progress = None
+        
+        # 取消事件（threading.Event，由调用方提供），每处理一个段落前检查
+        self.cancel_event = None
+        
+        # 字符 -> 候选字体元组 的LRU缓存（逐字符计算属性时使用，字形覆盖预检的结果预先放入）
+        self.candidates = CandidateMemo(font_manager.coverage_index)
+        # 没有字体支持的字符使用的后备字体（None表示不设置字体）
+        self.fallback_font = options.fallback_font if options.coverage_policy == COVERAGE_FALLBACK else None
+    
+    def reseed(self, seed):
+        """以段落种子重新设置随机数（段落并行时使用）"""
+        self.rng = random.Random(seed)
+        if self.stream_generator is not None:
+            self.stream_generator.reseed(self.rng)
+
+class DocumentConverter:
+    """
+    文档转换器，对Word文档中的每个字符随机应用字体和手写效果
+    每次转换的状态保存在ConversionJob中，同一个转换器可在多个线程中同时使用
+    """
+    
+    def __init__(self, font_manager, options=None, log=None, result_cache=None):
+        self.font_manager = font_manager
+        self.options = options or ConversionOptions()
+        self.log = log or print
+        self.result_cache = result_cache  # 转换结果缓存，仅在指定了随机种子时使用
+    
+    def new_job(self):
+        """创建一次转换的状态"""
+        return ConversionJob(self.font_manager, self.options)
+    
+    def convert(self, input_path, output_path, progress=None, cancel_event=None):
+        """
+        转换文档
+        
+        输出先写入临时文件，完成后再改名，取消或出错时不会留下不完整的输出文件
+        
+        Args:
+            input_path (str): 输入的.docx文件
+            output_path (str): 输出的.docx文件
+            progress (ProgressReporter): 进度通道，每处理一个段落报告一次（内部节流）
+            cancel_event (threading.Event): 设置后在下一个段落前停止转换
+            
+        Returns:
+            dict: 统计信息
+            
+        Raises:
+            ConversionCancelled: 转换被取消
+            CoverageError: 覆盖预检策略为abort且存在没有字体支持的字符
+        """
+        if self.options.coverage_policy not in COVERAGE_POLICIES:
+            raise ValueError(f"未知的覆盖预检策略: {self.options.coverage_policy}")
+        if self.options.coverage_policy == COVERAGE_FALLBACK and not self.options.fallback_font:
+            raise ValueError("覆盖预检策略为fallback时需要指定后备字体")
+        
+        self.log("开始字符级字体随机替换...")
+        
+        profiler = None
+        if self.options.profile:
+            profiler = Profiler(self.options.profile_functions, self.options.profile_memory)
+            profiler.start()
+        
+        # 指定了种子时相同的输入、选项和字体得到相同的结果，可直接使用缓存
+        cache_key = None
+        if self.result_cache is not None:
+            if self.options.seed is None:
+                self.log("未指定随机种子，不使用结果缓存")
+            else:
+                with stage(profiler, 'cache'):
+                    cache_key = self.result_cache.key_for(input_path, self.options, self.font_manager)
+                    cached = self.result_cache.get(cache_key, output_path)
+                if cached is not None:
+                    self.log("命中结果缓存，直接使用之前的转换结果")
+                    cached['used_fonts'] = set(cached['used_fonts'])
+                    cached['cache_hits'] = 1
+                    cached['cache_misses'] = 0
+                    return self._finish_profile(profiler, cached, output_path)
+        
+        self.log("正在处理文档，请稍候...")
+        
+        job = self.new_job()
+        job.profiler = profiler
+        job.progress = progress
+        job.cancel_event = cancel_event
+        partial_path = output_path + PARTIAL_SUFFIX
+        
+        # 段落并行：各段落的属性计算和run生成分配到进程池中
+        if self.options.paragraph_workers != 1:
+            job.paragraph_pool = ParagraphPool(type(self), self.font_manager, self.options,
+                                               self.options.paragraph_workers)
+        
+        try:
+            if self.options.streaming:
+                # 流式模式：正文的段落/表格逐个解析、处理并写出；段落并行时成批处理
+                transform = lambda elements: self._randomize_elements(job, elements)
+                batch_size = 1 if job.paragraph_pool is None else PARALLEL_BATCH_BLOCKS
+                self._plan_coverage(job, lambda: collect_package_chars(input_path))
+                stream_convert_package(input_path, partial_path, transform, transform,
+                                       self.options.compress_level, batch_size)
+            else:
+                self._convert_document(job, input_path, partial_path)
+            os.replace(partial_path, output_path)
+        except BaseException:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            if profiler is not None:
+                profiler.stop()
+            raise
+        finally:
+            if job.paragraph_pool is not None:
+                job.paragraph_pool.close()
+                job.paragraph_pool = None
+        
+        stats = job.stats
+        if stats['runs_created']:
+            stats['run_reduction_ratio'] = stats['total_chars'] / stats['runs_created']
+        # 批量生成时按整段查找字体，不使用候选字体缓存，命中率为None
+        stats['font_lookup'] = 'vectorized' if job.stream_generator is not None else 'memo'
+        lookups = stats['candidate_memo_hits'] + stats['candidate_memo_misses']
+        if lookups:
+            stats['candidate_memo_hit_rate'] = stats['candidate_memo_hits'] / lookups
+        
+        if cache_key is not None:
+            stats['cache_misses'] = 1
+            with stage(profiler, 'cache'):
+                self.result_cache.put(cache_key, output_path, stats_to_dict(stats))
+        return self._finish_profile(profiler, stats, output_path)
+    
+    def _finish_profile(self, profiler, stats, output_path):
+        """结束性能分析，将结果放入统计信息并写入输出文件旁的JSON文件"""
+        if profiler is None:
+            return stats
+        profiler.stop()
+        stats['profile'] = profiler.to_dict()
+        path = write_sidecar(output_path, stats['profile'])
+        self.log(f"性能分析结果已写入: {path}")
+        return stats
+    
+    def _convert_document(self, job, input_path, output_path):
+        """加载整个文档后处理正文、页眉和页脚中的所有段落"""
+        # 加载文档
+        with stage(job.profiler, 'load'):
+            doc = Document(input_path)
+        
+        parts = list(iter_story_parts(doc))
+        if job.progress is not None:
+            for part in parts:
+                job.progress.set_totals(*count_text(part.element))
+        self._plan_coverage(job, lambda: set().union(*(distinct_chars(part.element) for part in parts)))
+        
+        touched_parts = []
+        for part in parts:
+            self._randomize_elements(job, [part.element])
+            touched_parts.append(part.partname)
+        
+        # 保存文档（只重新写入处理过的部件，图片等其余部件直接复制）
+        with stage(job.profiler, 'save'):
+            save_document(doc, input_path, output_path, touched_parts,
+                          self.options.compress_level)
+    
+    def _plan_coverage(self, job, collect_chars):
+        """
+        字形覆盖预检：按文档中的不同字符建立覆盖计划并报告覆盖情况，
+        策略为abort且存在没有字体支持的字符时在处理任何段落前停止
+        
+        Args:
+            collect_chars (callable): 返回文档中出现的不同字符
+        """
+        if self.options.coverage_policy == COVERAGE_OFF:
+            return
+        with stage(job.profiler, 'coverage'):
+            plan = CoveragePlan(collect_chars(), self.font_manager)
+        job.candidates.preload(plan.candidates)
+        job.stats['coverage'] = plan.to_dict()
+        for line in format_coverage(job.stats['coverage']):
+            self.log(line)
+        if plan.uncovered and self.options.coverage_policy == COVERAGE_ABORT:
+            raise CoverageError(plan.uncovered)
+    
+    def _randomize_elements(self, job, elements):
+        """
+        处理elements中的全部段落（正文、表格、嵌套表格、文本框等），
+        每个段落使用独立的手写模拟器
+        """
+        paragraphs = [paragraph for element in elements for paragraph in iter_paragraphs(element)]
+        if job.paragraph_pool is not None:
+            self._randomize_paragraphs_parallel(job, paragraphs)
+            return
+        
+        for paragraph in paragraphs:
+            self._check_cancelled(job)
+            chars_before = job.stats['total_chars']
+            simulator = HandwritingSimulator(job.rng)
+            self._randomize_paragraph(job, paragraph, simulator)
+            
+            # 记录趋势数量（用于统计）
+            job.stats['handwriting_trends'] += simulator.char_count_since_correction
+            
+            if job.progress is not None:
+                job.progress.advance(1, job.stats['total_chars'] - chars_before)
+    
+    def _check_cancelled(self, job):
+        """取消事件已设置时停止转换"""
+        if job.cancel_event is not None and job.cancel_event.is_set():
+            raise ConversionCancelled("转换已取消")
+    
+    def _randomize_paragraphs_parallel(self, job, paragraphs):
+        """
+        段落并行：行间距和缩进在本进程中按顺序处理，并为每个段落派生独立的种子；
+        逐字符属性和run在工作进程中生成，按文档顺序放回各段落。
+        结果只取决于种子，与工作进程数无关
+        """
+        chars_before = job.stats['total_chars']
+        tasks = []
+        for paragraph in paragraphs:
+            self._check_cancelled(job)
+            with stage(job.profiler, 'prepare'):
+                pieces = self._prepare_paragraph(job, paragraph)
+            tasks.append((job.rng.getrandbits(64), pieces))
+        
+        # 工作进程中的属性计算和run生成整体计为parallel_render，每个任务之间检查是否取消
+        rendered = []
+        with stage(job.profiler, 'parallel_render'):
+            for data, chunk_stats in job.paragraph_pool.render(tasks, lambda: self._check_cancelled(job)):
+                merge_stats(job.stats, chunk_stats)
+                rendered.extend(parse_xml(data))
+        
+        with stage(job.profiler, 'emission'):
+            for paragraph, rendered_p in zip(paragraphs, rendered):
+                paragraph._p.extend(list(rendered_p))
+        
+        if job.progress is not None:
+            job.progress.advance(len(paragraphs), job.stats['total_chars'] - chars_before)
+    
+    def render_paragraphs(self, job, tasks):
+        """
+        在工作进程中按各段落的种子计算逐字符属性并生成run
+        
+        Args:
+            job (ConversionJob): 工作进程内的转换状态
+            tasks (list): [(段落种子, 需要处理的run), ...]
+            
+        Returns:
+            tuple: (序列化的段落XML，每个段落一个<w:p>, 统计信息)
+        """
+        job.stats = new_stats()
+        container = OxmlElement('w:body')
+        for seed, pieces in tasks:
+            job.reseed(seed)
+            simulator = HandwritingSimulator(job.rng)
+            paragraph = Paragraph(OxmlElement('w:p'), None)
+            self._emit_segments(job, paragraph, self._build_paragraph_segments(job, pieces, simulator))
+            job.stats['handwriting_trends'] += simulator.char_count_since_correction
+            container.append(paragraph._p)
+        return etree.tostring(container), job.stats
+    
+    def _randomize_paragraph(self, job, paragraph, simulator):
+        """
+        对单个段落应用字符级随机化
+        先为每个字符计算字体、字号和位置，再生成新的run；
+        启用合并时，属性相同的相邻字符合并为一个run。
+        快速模式下直接构建XML，否则通过python-docx代理对象逐个添加
+        """
+        with stage(job.profiler, 'prepare'):
+            pieces = self._prepare_paragraph(job, paragraph)
+        with stage(job.profiler, 'attributes'):
+            segments = self._build_paragraph_segments(job, pieces, simulator)
+        with stage(job.profiler, 'emission'):
+            self._emit_segments(job, paragraph, segments)
+    
+    def _prepare_paragraph(self, job, paragraph):
+        """
+        应用随机行间距和行首缩进，收集需要处理的run并清空其文本
+        
+        Returns:
+            list: [(文本, 粗体, 斜体, 下划线, 原始字号), ...]
+        """
+        settings = job.settings
+        stats = job.stats
+        
+        # 应用随机行间距
+        if settings['random_line_spacing'] and paragraph.text.strip():
+            # 根据力度调整行间距范围
+            random_spacing = job.rng.uniform(settings['line_spacing_min'], settings['line_spacing_max'])
+            paragraph.paragraph_format.line_spacing = random_spacing
+            stats['lines_with_random_spacing'] += 1
+        
+        # 应用随机行首缩进
+        if settings['random_indent'] and paragraph.text.strip():
+            # 在缩进范围内随机选择空格数量
+            indent_spaces = job.rng.randint(settings['indent_min'], settings['indent_max'])
+            # 在段落开头添加空格
+            if paragraph.runs:
+                # 如果段落已有内容，在第一个run前插入空格
+                first_run = paragraph.runs[0]
+                spaces = " " * indent_spaces
+                first_run.text = spaces + first_run.text
+                stats['lines_with_random_indent'] += 1
+            else:
+                # 如果段落没有内容，添加一个包含空格的run
+                paragraph.add_run(" " * indent_spaces)
+                stats['lines_with_random_indent'] += 1
+        
+        # 收集需要处理的run: (文本, 粗体, 斜体, 下划线, 原始字号)
+        pieces = []
+        for run in list(paragraph.runs):
+            text = run.text
+            if not text.strip():
+                continue
+            
+            # 保存原始格式
+            pieces.append((text, run.bold, run.italic, run.underline, run.font.size))
+            
+            # 清空原始run
+            run.text = ""
+        return pieces
+    
+    def _build_paragraph_segments(self, job, pieces, simulator):
+        """
+        逐字符计算run属性
+        
+        Returns:
+            list: [(文本, (字体, 粗体, 斜体, 下划线, 字号半磅, 倾斜半磅, 位置半磅)), ...]，
+                每项为二元列表或元组
+        """
+        if job.stream_generator is not None:
+            return self._build_segments_vectorized(job, pieces, simulator)
+        return self._build_segments(job, pieces, simulator)
+    
+    def _emit_segments(self, job, paragraph, segments):
+        """在段落末尾生成run"""
+        if job.emitter is not None:
+            job.emitter.emit(paragraph, segments)
+        else:
+            for text, key in segments:
+                add_styled_run(paragraph, text, key)
+        job.stats['runs_created'] += len(segments)
+    
+    def _append_segment(self, segments, char, key, settings):
+        """添加一个字符；启用合并时，与前一个字符属性相同则并入同一个run"""
+        if settings['merge_runs']:
+            key = self._quantize_run_key(key, settings['merge_step'])
+            if segments and segments[-1][1] == key:
+                segments[-1][0] += char
+                return
+        segments.append([char, key])
+    
+    def _build_segments(self, job, pieces, simulator):
+        """逐字符计算属性"""
+        settings = job.settings
+        stats = job.stats
+        memo = job.candidates
+        hits_before = memo.hits
+        misses_before = memo.misses
+        
+        # 初始化字符大小跟踪和高度位置跟踪
+        last_char_size = None
+        job.last_char_position = None
+        
+        segments = []
+        for text, original_bold, original_italic, original_underline, original_size in pieces:
+            for char in text:
+                # 查找支持该字符的字体：每个不同的字符只查询一次覆盖索引，每次出现仍单独随机选择
+                candidates = memo.get(char)
+                if candidates:
+                    font_name = job.rng.choice(candidates)
+                    stats['chars_with_font'] += 1
+                    stats['used_fonts'].add(font_name)
+                else:
+                    font_name = job.fallback_font
+                    stats['chars_without_font'] += 1
+                    if font_name:
+                        stats['chars_with_fallback'] += 1
+                        stats['used_fonts'].add(font_name)
+                
+                # 应用随机字符大小
+                size = None
+                if settings['random_char_size'] and original_size:
+                    current_size = self._get_random_char_size(
+                        job, original_size.pt, last_char_size, settings['char_size_range']
+                    )
+                    size = int(current_size * 2)
+                    last_char_size = current_size
+                    stats['chars_with_random_size'] += 1
+                elif original_size:
+                    # 保持原始大小
+                    size = int(original_size.pt * 2)
+                    last_char_size = original_size.pt
+                
+                # 应用手写倾斜效果
+                tilt = None
+                if settings['handwriting']:
+                    tilt_angle = simulator.get_char_tilt(char)
+                    # 根据强度调整倾斜幅度
+                    tilt = self._to_half_points(tilt_angle * settings['max_tilt_multiplier'])
+                
+                # 应用字符高度位置随机化（限制相邻字符高度落差）
+                position = self._to_half_points(self._get_random_char_position(job))
+                
+                key = (font_name, original_bold, original_italic, original_underline, size, tilt, position)
+                self._append_segment(segments, char, key, settings)
+            
+            stats['total_chars'] += len(text)
+        
+        stats['candidate_memo_hits'] += memo.hits - hits_before
+        stats['candidate_memo_misses'] += memo.misses - misses_before
+        return segments
+    
+    def _build_segments_vectorized(self, job, pieces, simulator):
+        """以StreamGenerator一次生成整个段落的逐字符属性"""
+        settings = job.settings
+        stats = job.stats
+        streams = job.stream_generator.generate(
+            [(text, size.pt if size else None) for text, _, _, _, size in pieces]
+        )
+        # 统计趋势数量时与逐字符实现一致，记录最后一个趋势已持续的字符数
+        simulator.char_count_since_correction = streams.last_trend_length
+        
+        fonts = streams.fonts
+        used_fonts = set(fonts)
+        used_fonts.discard(None)
+        chars_with_font = len(fonts) - fonts.count(None)
+        stats['chars_with_font'] += chars_with_font
+        stats['chars_without_font'] += len(fonts) - chars_with_font
+        stats['used_fonts'].update(used_fonts)
+        if job.fallback_font and chars_with_font < len(fonts):
+            fallback = job.fallback_font
+            fonts = [font_name if font_name is not None else fallback for font_name in fonts]
+            stats['chars_with_fallback'] += len(fonts) - chars_with_font
+            stats['used_fonts'].add(fallback)
+        stats['chars_with_random_size'] += streams.random_size_count
+        
+        # run属性元组由zip整体组装，不逐个字符执行Python代码
+        segments = []
+        start = 0
+        for text, original_bold, original_italic, original_underline, _ in pieces:
+            end = start + len(text)
+            keys = zip(fonts[start:end], repeat(original_bold), repeat(original_italic),
+                       repeat(original_underline), streams.sizes[start:end],
+                       streams.tilts[start:end], streams.positions[start:end])
+            if settings['merge_runs']:
+                # 生成器已按合并档位量化，属性相同的相邻字符直接分组；与前一个run属性相同时并入
+                for key, group in groupby(zip(text, keys), key=itemgetter(1)):
+                    chars = "".join([char for char, _ in group])
+                    if segments and segments[-1][1] == key:
+                        segments[-1][0] += chars
+                    else:
+                        segments.append([chars, key])
+            else:
+                segments.extend(zip(text, keys))
+            start = end
+            stats['total_chars'] += len(text)
+        return segments
+    
+    def _quantize_run_key(self, key, step):
+        """
+        将字号与位置量化到同一档位，便于合并相邻run
+        step为档位宽度（磅），0.5磅即Word的半磅精度，不改变输出效果
+        """
+        font_name, bold, italic, underline, size, tilt, position = key
+        bucket = max(1, int(round(step * 2)))
+        if bucket > 1:
+            size = None if size is None else int(round(size / bucket)) * bucket
+            tilt = None if tilt is None else int(round(tilt / bucket)) * bucket
+            position = None if position is None else int(round(position / bucket)) * bucket
+        return font_name, bold, italic, underline, size, tilt, position
+    
+    def _to_half_points(self, value):
+        """将磅值转换为Word位置单位（半磅），忽略非常小的偏移"""
+        if abs(value) < 0.1:
+            return None
+        return int(value * 2)
+    
+    def _get_random_char_size(self, job, base_size, last_char_size=None, size_range=0.8):
+        """
+        获取随机字符大小
+        在原有字号加减指定范围的区域随机，且相邻两个字符的字号差距不超过0.5
+        """
+        if last_char_size is None:
+            # 第一个字符，在基础大小±size_range范围内随机
+            min_size = max(6, base_size - size_range)  # 最小6pt
+            max_size = base_size + size_range
+            return job.rng.uniform(min_size, max_size)
+        else:
+            # 后续字符，确保与上一个字符的差距不超过0.5
+            min_size = max(6, last_char_size - 0.5, base_size - size_range)
+            max_size = min(last_char_size + 0.5, base_size + size_range)
+            return job.rng.uniform(min_size, max_size)
+    
+    def _get_random_char_position(self, job):
+        """
+        获取随机字符高度位置
+        限制相邻字符的高度落差在合理范围内（-2到2磅之间，相邻字符差距不超过1磅）
+        """
+        if job.last_char_position is None:
+            # 第一个字符，随机位置
+            position = job.rng.uniform(-2.5, 2.5)
+        else:
+            # 后续字符，确保与上一个字符的高度差距不超过1磅
+            min_position = max(-2.5, job.last_char_position - 0.5)
+            max_position = min(2.5, job.last_char_position + 0.5)
+            position = job.rng.uniform(min_position, max_position)
+        
+        job.last_char_position = position
+        return position
+
+def convert(input_path, output_path, options=None, fonts_dir="fonts", font_manager=None, log=None,
+            cache_dir=None, cache_max_bytes=DEFAULT_MAX_BYTES):
+    """
+    转换单个文档（无界面接口）
+    
+    Args:
+        input_path (str): 输入的.docx文件
+        output_path (str): 输出的.docx文件
+        options (ConversionOptions): 转换选项，None使用默认值
+        fonts_dir (str): 字体目录（未提供font_manager时使用）
+        font_manager (FontManager): 已加载的字体管理器，可在多次转换间复用
+        log (callable): 日志输出函数，默认print
+        cache_dir (str): 转换结果缓存目录，None表示不使用缓存（仅在指定了种子时生效）
+        cache_max_bytes (int): 转换结果缓存的大小上限（字节）
+        
+    Returns:
+        dict: 统计信息
+    """
+    if font_manager is None:
+        font_manager = FontManager(fonts_dir)
+    if len(font_manager.font_files) < 2:
+        raise ValueError("至少需要2个字体文件才能实现字符级随机替换")
+    
+    result_cache = ResultCache(cache_dir, cache_max_bytes) if cache_dir else None
+    return DocumentConverter(font_manager, options, log, result_cache).convert(input_path, output_path)
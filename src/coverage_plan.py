@@ -0,0 +1,91 @@
+"""
+字形覆盖预检
+转换前先收集文档中出现的不同字符，逐个（而非逐次出现）查询覆盖索引，
+得到每个字符的候选字体、没有任何字体支持的字符以及各字体的覆盖情况。
+转换时直接按字符取出候选字体，不再逐字符二分查找覆盖索引。
+"""
+
+from collections import Counter
+
+# 覆盖预检策略
+COVERAGE_OFF = "off"  # 不预检，逐字符查找字体
+COVERAGE_REPORT = "report"  # 预检并报告覆盖情况
+COVERAGE_ABORT = "abort"  # 存在没有字体支持的字符时停止转换
+COVERAGE_FALLBACK = "fallback"  # 没有字体支持的字符使用指定的后备字体
+COVERAGE_POLICIES = (COVERAGE_OFF, COVERAGE_REPORT, COVERAGE_ABORT, COVERAGE_FALLBACK)
+
+# 日志和错误信息中最多列出的未覆盖字符数
+MAX_LISTED_CHARS = 50
+
+
+class CoverageError(ValueError):
+    """文档中存在没有任何字体支持的字符（覆盖预检策略为abort时）"""
+
+    def __init__(self, uncovered):
+        """
+        Args:
+            uncovered (list): 没有字体支持的字符
+        """
+        self.uncovered = list(uncovered)
+        super().__init__(f"{len(self.uncovered)} 个字符没有字体支持: {format_chars(self.uncovered)}")
+
+    def __reduce__(self):
+        # 按构造参数重建，异常可以从工作进程（批量转换、HTTP服务）传回主进程
+        return self.__class__, (self.uncovered,)
+
+
+def format_chars(chars):
+    """将字符列表整理为便于阅读的文本，控制字符和空白以U+XXXX表示"""
+    listed = [char if char.isprintable() and not char.isspace() else f"U+{ord(char):04X}"
+              for char in chars[:MAX_LISTED_CHARS]]
+    text = " ".join(listed)
+    if len(chars) > MAX_LISTED_CHARS:
+        text += f" ...（共 {len(chars)} 个）"
+    return text
+
+
+class CoveragePlan:
+    """
+    一个文档的字形覆盖计划
+    candidates 即文档字符 × 字体的覆盖矩阵：字符 -> 支持它的字体元组（按字体加载顺序）
+    """
+
+    def __init__(self, chars, font_manager):
+        """
+        Args:
+            chars (iterable): 文档中出现的不同字符
+            font_manager (FontManager): 已加载的字体管理器
+        """
+        index = font_manager.coverage_index
+        self.candidates = {char: index.fonts_for(ord(char)) for char in chars}
+        self.uncovered = sorted(char for char, fonts in self.candidates.items() if not fonts)
+
+        # 相同字体组合的字符很多，先按组合计数再展开到各字体
+        font_counts = Counter()
+        for fonts, count in Counter(self.candidates.values()).items():
+            for font_name in fonts:
+                font_counts[font_name] += count
+        self.font_counts = {font_name: font_counts[font_name] for font_name in font_manager.get_font_names()}
+
+    def to_dict(self):
+        """可JSON序列化的覆盖报告"""
+        total = len(self.candidates)
+        return {
+            'distinct_chars': total,
+            'uncovered_chars': "".join(self.uncovered),
+            'fonts': {
+                font_name: {'covered_chars': count, 'ratio': round(count / total, 4) if total else 1.0}
+                for font_name, count in self.font_counts.items()
+            }
+        }
+
+
+def format_coverage(report):
+    """将覆盖报告整理为便于阅读的文本行"""
+    lines = [f"文档包含 {report['distinct_chars']} 个不同字符，"
+             f"{len(report['uncovered_chars'])} 个没有字体支持"]
+    if report['uncovered_chars']:
+        lines.append(f"  未覆盖: {format_chars(report['uncovered_chars'])}")
+    for font_name, entry in sorted(report['fonts'].items(), key=lambda item: -item[1]['covered_chars']):
+        lines.append(f"  {font_name:<24}{entry['covered_chars']:>7} 个字符 {entry['ratio']:>6.1%}")
+    return lines
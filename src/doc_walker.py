@@ -0,0 +1,65 @@
+"""
+文档遍历
+按文档顺序找出需要处理的全部段落：正文、表格（含嵌套表格和合并单元格）、
+内容控件、文本框，以及页眉和页脚。直接遍历XML中的<w:p>，
+每个段落只出现一次，不会像python-docx的 row.cells 那样重复返回合并单元格。
+"""
+
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.oxml.ns import qn
+from docx.text.paragraph import Paragraph
+
+# 需要处理的页眉/页脚关系类型
+HEADER_FOOTER_RELTYPES = (RT.HEADER, RT.FOOTER)
+
+_P_TAG = qn('w:p')
+_T_TAG = qn('w:t')
+
+
+def iter_paragraphs(element):
+    """
+    按文档顺序返回element（含自身）中的全部段落
+
+    先收集再返回，处理段落时修改XML不会影响遍历
+    """
+    return [Paragraph(p, None) for p in list(element.iter(_P_TAG))]
+
+
+def count_text(element):
+    """
+    统计element中的段落数和文本字符数（用于估计转换进度）
+
+    Returns:
+        tuple: (段落数, 字符数)
+    """
+    paragraphs = sum(1 for _ in element.iter(_P_TAG))
+    chars = sum(len(t.text) for t in element.iter(_T_TAG) if t.text)
+    return paragraphs, chars
+
+
+def distinct_chars(element):
+    """element中出现的不同文本字符（用于字形覆盖预检）"""
+    chars = set()
+    for t in element.iter(_T_TAG):
+        if t.text:
+            chars.update(t.text)
+    return chars
+
+
+def iter_header_footer_parts(document_part):
+    """主文档引用的页眉/页脚部件，多个节共用的部件只返回一次"""
+    seen = set()
+    for rel in document_part.rels.values():
+        if rel.is_external or rel.reltype not in HEADER_FOOTER_RELTYPES:
+            continue
+        part = rel.target_part
+        if part.partname in seen:
+            continue
+        seen.add(part.partname)
+        yield part
+
+
+def iter_story_parts(document):
+    """需要处理的全部部件：主文档，然后是页眉和页脚"""
+    yield document.part
+    yield from iter_header_footer_parts(document.part)
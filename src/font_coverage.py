@@ -0,0 +1,364 @@
+"""
+字体字符覆盖信息
+负责从字体文件中提取支持的字符集，并维护持久化的覆盖缓存，
+使未改动的字体在下次启动时无需重新解析
+"""
+
+import os
+import sys
+import json
+import zlib
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from fontTools.ttLib import TTFont
+
+# 覆盖缓存文件名（保存在字体目录中）
+CACHE_FILENAME = ".font_coverage_cache"
+# 缓存格式版本，格式变化时递增使旧缓存失效
+CACHE_VERSION = 1
+# 每次转换的 字符 -> 候选字体 缓存的条目上限（足以容纳常用汉字）
+CANDIDATE_MEMO_SIZE = 8192
+
+
+def read_font_chars(font_path, keep_font=False):
+    """
+    解析字体文件并获取其支持的字符集
+
+    默认以惰性方式打开字体，只解码cmap表，读取完毕后立即关闭，
+    其余字形和度量表不会被解析，也不会常驻内存。
+
+    Args:
+        font_path (str): 字体文件路径
+        keep_font (bool): 是否保留打开的TTFont对象
+
+    Returns:
+        tuple: (TTFont对象或None, CharCoverage)
+    """
+    font = TTFont(font_path, lazy=True)
+    try:
+        chars = set()
+        for table in font['cmap'].tables:
+            chars.update(table.cmap.keys())
+    finally:
+        if not keep_font:
+            font.close()
+    return (font if keep_font else None), CharCoverage.from_chars(chars)
+
+
+def iter_font_coverages(font_paths, cache=None, workers=None, keep_font=False):
+    """
+    按完成顺序逐个产出字体的字符覆盖信息
+
+    命中覆盖缓存的字体立即产出；其余字体在进程池中并行解析，
+    解析结果写回缓存（缓存由调用方保存）。保留字体对象时TTFont
+    无法跨进程传递，此时在当前进程中逐个解析。
+
+    Args:
+        font_paths (list): 字体文件路径列表
+        cache (CoverageCache): 覆盖缓存，None表示不使用缓存
+        workers (int): 进程数，None表示使用CPU核心数，1表示不启用进程池
+        keep_font (bool): 是否保留打开的TTFont对象
+
+    Yields:
+        tuple: (字体路径, TTFont对象或None, CharCoverage或None, 异常或None)
+    """
+    pending = []
+    for font_path in font_paths:
+        try:
+            coverage = cache.get(font_path) if cache and not keep_font else None
+        except OSError as e:
+            yield font_path, None, None, e
+            continue
+        if coverage is not None:
+            yield font_path, None, coverage, None
+        else:
+            pending.append(font_path)
+
+    if keep_font or workers == 1 or len(pending) < 2:
+        for font_path in pending:
+            try:
+                font, coverage = read_font_chars(font_path, keep_font=keep_font)
+            except Exception as e:
+                yield font_path, None, None, e
+                continue
+            if cache:
+                cache.put(font_path, coverage)
+            yield font_path, font, coverage, None
+        return
+
+    max_workers = min(workers or os.cpu_count() or 1, len(pending))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(read_font_chars, path): path for path in pending}
+        for future in as_completed(futures):
+            font_path = futures[future]
+            try:
+                _, coverage = future.result()
+            except Exception as e:
+                yield font_path, None, None, e
+                continue
+            if cache:
+                cache.put(font_path, coverage)
+            yield font_path, None, coverage, None
+
+
+class CharCoverage:
+    """
+    紧凑的字符覆盖集合
+    以有序的区间起止数组保存码位，连续码位只占一个区间，
+    成员判断通过二分查找完成
+    """
+
+    __slots__ = ('starts', 'ends', '_count')
+
+    def __init__(self, starts=(), ends=()):
+        self.starts = array('I', starts)  # 区间起点（含）
+        self.ends = array('I', ends)  # 区间终点（含）
+        self._count = sum(e - s + 1 for s, e in zip(self.starts, self.ends))
+
+    @classmethod
+    def from_chars(cls, chars):
+        """由任意码位集合构建"""
+        starts = []
+        ends = []
+        for code in sorted(chars):
+            if ends and code == ends[-1] + 1:
+                ends[-1] = code
+            elif not ends or code > ends[-1]:
+                starts.append(code)
+                ends.append(code)
+        return cls(starts, ends)
+
+    @classmethod
+    def from_encoded(cls, encoded):
+        """
+        由差分编码的区间列表还原（覆盖缓存中的保存格式）
+
+        列表依次为 [起点-上一终点, 终点-起点, ...]
+        """
+        starts = []
+        ends = []
+        previous = 0
+        for i in range(0, len(encoded), 2):
+            start = previous + encoded[i]
+            previous = start + encoded[i + 1]
+            starts.append(start)
+            ends.append(previous)
+        return cls(starts, ends)
+
+    def to_encoded(self):
+        """转换为差分编码的区间列表，CJK字体中大段连续的码位因此只占很少的空间"""
+        encoded = []
+        previous = 0
+        for start, end in zip(self.starts, self.ends):
+            encoded.extend((start - previous, end - start))
+            previous = end
+        return encoded
+
+    def ranges(self):
+        """遍历所有 (起点, 终点) 区间"""
+        return zip(self.starts, self.ends)
+
+    @property
+    def nbytes(self):
+        """占用的内存字节数"""
+        return sys.getsizeof(self.starts) + sys.getsizeof(self.ends)
+
+    def __contains__(self, code):
+        i = bisect_right(self.starts, code) - 1
+        return i >= 0 and code <= self.ends[i]
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        for start, end in zip(self.starts, self.ends):
+            yield from range(start, end + 1)
+
+
+class CoverageIndex:
+    """
+    码位 -> 支持字体 的区间索引
+    将所有字体的区间端点合并为一组分段，每段记录覆盖该段的字体元组，
+    查询时一次二分查找即可得到支持某字符的全部字体
+    """
+
+    def __init__(self, coverages):
+        """
+        Args:
+            coverages (dict): 字体名称 -> CharCoverage，按字体加载顺序排列
+        """
+        events = {}
+        for font_name, coverage in coverages.items():
+            for start, end in coverage.ranges():
+                events.setdefault(start, []).append((font_name, 1))
+                events.setdefault(end + 1, []).append((font_name, -1))
+
+        font_order = list(coverages)
+        active = set()
+        shared = {(): ()}  # 相同字体组合的分段共用同一个元组
+        starts = []
+        fonts = []
+        for point in sorted(events):
+            for font_name, delta in events[point]:
+                if delta > 0:
+                    active.add(font_name)
+                else:
+                    active.discard(font_name)
+            key = tuple(name for name in font_order if name in active)
+            key = shared.setdefault(key, key)
+            if fonts and fonts[-1] is key:
+                continue
+            starts.append(point)
+            fonts.append(key)
+
+        self.starts = array('I', starts)
+        self.fonts = fonts
+        self.combination_count = len(shared)
+
+    def fonts_for(self, char_code):
+        """
+        获取支持指定码位的字体
+
+        Returns:
+            tuple: 字体名称元组，没有字体支持时为空元组
+        """
+        i = bisect_right(self.starts, char_code) - 1
+        if i < 0:
+            return ()
+        return self.fonts[i]
+
+    @property
+    def nbytes(self):
+        """索引自身占用的内存字节数（不含字体名称字符串）"""
+        return sys.getsizeof(self.starts) + sys.getsizeof(self.fonts)
+
+    def __len__(self):
+        return len(self.starts)
+
+
+class CandidateMemo:
+    """
+    字符 -> 候选字体元组 的有界LRU缓存，每次转换一个
+    文档中的字符集通常很小而重复次数很多，每个不同的字符只查询一次覆盖索引；
+    字符种类超过上限时淘汰最久未使用的字符，内存占用不随文档增长
+    """
+
+    def __init__(self, index, max_size=CANDIDATE_MEMO_SIZE):
+        self.index = index
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, char):
+        """
+        获取支持字符的字体
+
+        Returns:
+            tuple: 字体名称元组，没有字体支持时为空元组
+        """
+        entries = self.entries
+        candidates = entries.get(char)
+        if candidates is not None:
+            self.hits += 1
+            entries.move_to_end(char)
+            return candidates
+        self.misses += 1
+        candidates = self.index.fonts_for(ord(char))
+        self._put(char, candidates)
+        return candidates
+
+    def _put(self, char, candidates):
+        self.entries[char] = candidates
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def preload(self, candidates):
+        """
+        预先放入已知字符的候选字体（如字形覆盖预检的结果），
+        同样受条目上限约束，超出上限的字符在转换时按需查询
+        """
+        for char, fonts in candidates.items():
+            self._put(char, fonts)
+
+
+class CoverageCache:
+    """
+    字体覆盖缓存
+    以字体文件名、大小和修改时间为键保存字符集，
+    只有新增或修改过的字体才需要重新解析
+    """
+
+    def __init__(self, cache_path):
+        self.cache_path = cache_path
+        self.entries = {}  # 字体文件名 -> {size, mtime, ranges}
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        """从磁盘读取缓存，缓存损坏或版本不符时视为空缓存"""
+        self.entries = {}
+        self.dirty = False
+        if not os.path.exists(self.cache_path):
+            return
+
+        try:
+            with open(self.cache_path, 'rb') as f:
+                data = json.loads(zlib.decompress(f.read()).decode('utf-8'))
+            if data.get('version') == CACHE_VERSION:
+                self.entries = data.get('fonts', {})
+        except Exception as e:
+            print(f"读取字体覆盖缓存时出错，将重新解析字体: {e}")
+
+    def save(self):
+        """将缓存写回磁盘（仅在有变化时）"""
+        if not self.dirty:
+            return
+
+        data = {'version': CACHE_VERSION, 'fonts': self.entries}
+        payload = zlib.compress(json.dumps(data, separators=(',', ':')).encode('utf-8'), 9)
+        tmp_path = self.cache_path + ".tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, self.cache_path)
+            self.dirty = False
+        except OSError as e:
+            print(f"写入字体覆盖缓存时出错: {e}")
+
+    def _stat_key(self, font_path):
+        stat = os.stat(font_path)
+        return os.path.basename(font_path), stat.st_size, stat.st_mtime_ns
+
+    def get(self, font_path):
+        """
+        获取字体的缓存字符集
+
+        Returns:
+            CharCoverage or None: 字符覆盖集合，字体未缓存或已修改时返回None
+        """
+        name, size, mtime = self._stat_key(font_path)
+        entry = self.entries.get(name)
+        if not entry or entry['size'] != size or entry['mtime'] != mtime:
+            return None
+        return CharCoverage.from_encoded(entry['ranges'])
+
+    def put(self, font_path, coverage):
+        """记录字体的字符集"""
+        name, size, mtime = self._stat_key(font_path)
+        self.entries[name] = {
+            'size': size,
+            'mtime': mtime,
+            'ranges': coverage.to_encoded()
+        }
+        self.dirty = True
+
+    def prune(self, font_paths):
+        """删除已不存在的字体的缓存条目"""
+        keep = {os.path.basename(path) for path in font_paths}
+        for name in list(self.entries):
+            if name not in keep:
+                del self.entries[name]
+                self.dirty = True
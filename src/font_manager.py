@@ -1,137 +1,214 @@
-import os
-import random
-import glob
-from fontTools.ttLib import TTFont
-
-class FontManager:
-    """
-    字体管理器
-    负责加载字体文件、检查字符可用性和字体选择
-    """
-    
-    def __init__(self, fonts_dir="fonts"):
-        self.fonts_dir = fonts_dir
-        self.font_files = []
-        self.font_cache = {}  # 字体名称 -> {path, chars, object}
-        self.load_fonts()
-    
-    def load_fonts(self):
-        """
-        加载所有字体文件并预加载字符信息
-        
-        Returns:
-            int: 成功加载的字体数量
-        """
-        self.font_files = []
-        self.font_cache = {}
-        
-        if not os.path.exists(self.fonts_dir):
-            print(f"字体目录不存在: {self.fonts_dir}")
-            return 0
-        
-        loaded_count = 0
-        for ext in ['*.ttf', '*.otf']:
-            font_paths = glob.glob(os.path.join(self.fonts_dir, ext))
-            for font_path in font_paths:
-                try:
-                    # 加载字体文件
-                    font = TTFont(font_path)
-                    font_name = os.path.splitext(os.path.basename(font_path))[0]
-                    
-                    # 获取字体支持的字符集
-                    chars = set()
-                    for table in font['cmap'].tables:
-                        chars.update(table.cmap.keys())
-                    
-                    # 缓存字体信息
-                    self.font_cache[font_name] = {
-                        'path': font_path,
-                        'chars': chars,
-                        'object': font
-                    }
-                    self.font_files.append(font_path)
-                    loaded_count += 1
-                    
-                    print(f"加载字体: {font_name} (包含 {len(chars)} 个字符)")
-                    
-                except Exception as e:
-                    print(f"加载字体 {font_path} 时出错: {e}")
-        
-        return loaded_count
-    
-    def get_font_for_char(self, char):
-        """
-        为指定字符查找可用的字体
-        
-        Args:
-            char (str): 要查找字体的字符
-            
-        Returns:
-            str or None: 字体名称，如果找不到返回None
-        """
-        if not self.font_cache:
-            return None
-            
-        char_code = ord(char)
-        
-        # 收集所有支持该字符的字体
-        supported_fonts = []
-        for font_name, font_info in self.font_cache.items():
-            if char_code in font_info['chars']:
-                supported_fonts.append(font_name)
-        
-        # 在支持字符的字体中随机选择
-        if supported_fonts:
-            return random.choice(supported_fonts)
-        else:
-            # 如果没有字体支持该字符，返回None
-            return None
-    
-    def get_random_font_name(self):
-        """
-        获取随机字体名称
-        
-        Returns:
-            str or None: 随机字体名称
-        """
-        if not self.font_cache:
-            return None
-        return random.choice(list(self.font_cache.keys()))
-    
-    def get_font_count(self):
-        """获取字体数量"""
-        return len(self.font_cache)
-    
-    def get_font_names(self):
-        """获取所有字体名称"""
-        return list(self.font_cache.keys())
-    
-    def get_font_info(self, font_name):
-        """
-        获取字体详细信息
-        
-        Args:
-            font_name (str): 字体名称
-            
-        Returns:
-            dict or None: 字体信息
-        """
-        return self.font_cache.get(font_name)
-    
-    def is_char_supported(self, font_name, char):
-        """
-        检查字体是否支持指定字符
-        
-        Args:
-            font_name (str): 字体名称
-            char (str): 要检查的字符
-            
-        Returns:
-            bool: 是否支持
-        """
-        font_info = self.font_cache.get(font_name)
-        if not font_info:
-            return False
-        
-        char_code = ord(char)
+import os
+import json
+import random
+import glob
+import hashlib
+from fontTools.ttLib import TTFont
+
+try:
+    from .font_coverage import CACHE_FILENAME, CoverageCache, CoverageIndex, iter_font_coverages
+except ImportError:
+    from font_coverage import CACHE_FILENAME, CoverageCache, CoverageIndex, iter_font_coverages
+
+class FontManager:
+    """
+    字体管理器
+    负责加载字体文件、检查字符可用性和字体选择
+    """
+    
+    def __init__(self, fonts_dir="fonts", use_cache=True, lazy=True, workers=None,
+                 on_font_loaded=None):
+        self.fonts_dir = fonts_dir
+        self.use_cache = use_cache
+        self.lazy = lazy  # 只读取cmap表，不保留TTFont对象
+        self.workers = workers  # 解析字体的进程数，None表示CPU核心数
+        self.font_files = []
+        self.font_cache = {}  # 字体名称 -> {path, chars, object}（惰性模式下object为None）
+        self.coverage_index = CoverageIndex({})  # 码位区间 -> 支持该区间的字体名称元组
+        self.fingerprint = None  # 字体集合的指纹（首次使用时计算）
+        self.load_fonts(on_font_loaded)
+    
+    def load_fonts(self, on_font_loaded=None):
+        """
+        加载所有字体文件并预加载字符信息
+        
+        未缓存的字体在进程池中并行解析，全部完成后按文件名顺序
+        合并，保证字体顺序与完成先后无关。
+        
+        Args:
+            on_font_loaded (callable): 每个字体加载完成时的回调，
+                参数为 (字体名称, 字体信息)，在调用线程中按完成顺序调用
+        
+        Returns:
+            int: 成功加载的字体数量
+        """
+        self.font_files = []
+        self.font_cache = {}
+        self.fingerprint = None
+        
+        if not os.path.exists(self.fonts_dir):
+            print(f"字体目录不存在: {self.fonts_dir}")
+            return 0
+        
+        # 未改动的字体直接使用覆盖缓存，无需重新解析
+        cache = None
+        if self.use_cache:
+            cache = CoverageCache(os.path.join(self.fonts_dir, CACHE_FILENAME))
+        
+        font_paths = []
+        for ext in ['*.ttf', '*.otf']:
+            font_paths.extend(glob.glob(os.path.join(self.fonts_dir, ext)))
+        font_paths.sort()
+        
+        loaded = {}
+        for font_path, font, chars, error in iter_font_coverages(
+                font_paths, cache, self.workers, keep_font=not self.lazy):
+            if error is not None:
+                print(f"加载字体 {font_path} 时出错: {error}")
+                continue
+            
+            font_name = os.path.splitext(os.path.basename(font_path))[0]
+            
+            # 缓存字体信息
+            loaded[font_path] = font_name, {
+                'path': font_path,
+                'chars': chars,
+                'object': font
+            }
+            print(f"加载字体: {font_name} (包含 {len(chars)} 个字符, 占用 {chars.nbytes / 1024:.1f} KB)")
+            
+            if on_font_loaded:
+                on_font_loaded(font_name, loaded[font_path][1])
+        
+        for font_path in font_paths:
+            if font_path in loaded:
+                font_name, font_info = loaded[font_path]
+                self.font_cache[font_name] = font_info
+                self.font_files.append(font_path)
+        
+        if cache:
+            cache.prune(self.font_files)
+            cache.save()
+        
+        self.coverage_index = CoverageIndex(
+            {name: info['chars'] for name, info in self.font_cache.items()}
+        )
+        return len(self.font_files)
+    
+    def get_font_for_char(self, char, rng=None):
+        """
+        为指定字符查找可用的字体
+        
+        Args:
+            char (str): 要查找字体的字符
+            rng (random.Random): 随机数生成器，None使用全局random
+            
+        Returns:
+            str or None: 字体名称，如果找不到返回None
+        """
+        # 在支持字符的字体中随机选择
+        supported_fonts = self.coverage_index.fonts_for(ord(char))
+        if supported_fonts:
+            return (rng or random).choice(supported_fonts)
+        else:
+            # 如果没有字体支持该字符，返回None
+            return None
+    
+    def get_random_font_name(self, rng=None):
+        """
+        获取随机字体名称
+        
+        Args:
+            rng (random.Random): 随机数生成器，None使用全局random
+        
+        Returns:
+            str or None: 随机字体名称
+        """
+        if not self.font_cache:
+            return None
+        return (rng or random).choice(list(self.font_cache.keys()))
+    
+    def get_font_count(self):
+        """获取字体数量"""
+        return len(self.font_cache)
+    
+    def get_font_names(self):
+        """获取所有字体名称"""
+        return list(self.font_cache.keys())
+    
+    def get_memory_usage(self):
+        """
+        获取字符覆盖数据占用的内存
+        
+        Returns:
+            int: 所有字体字符集与码位索引的总字节数
+        """
+        total = sum(info['chars'].nbytes for info in self.font_cache.values())
+        return total + self.coverage_index.nbytes
+    
+    def get_fingerprint(self):
+        """
+        获取字体集合的指纹
+        
+        由字体名称、加载顺序和各字体的字符覆盖计算，
+        转换结果只取决于这些信息，字体文件移动或重新复制不会改变指纹
+        
+        Returns:
+            str: SHA-256十六进制摘要
+        """
+        if self.fingerprint is None:
+            digest = hashlib.sha256()
+            for name, info in self.font_cache.items():
+                digest.update(json.dumps([name, info['chars'].to_encoded()]).encode('utf-8'))
+            self.fingerprint = digest.hexdigest()
+        return self.fingerprint
+    
+    def get_font_info(self, font_name):
+        """
+        获取字体详细信息
+        
+        Args:
+            font_name (str): 字体名称
+            
+        Returns:
+            dict or None: 字体信息
+        """
+        return self.font_cache.get(font_name)
+    
+    def get_font_object(self, font_name):
+        """
+        获取字体的TTFont对象（用于需要字体度量等信息的功能）
+        
+        惰性模式下字体对象不常驻内存，每次调用都会重新打开字体文件，
+        调用方使用完毕后应调用close()释放。
+        
+        Args:
+            font_name (str): 字体名称
+            
+        Returns:
+            TTFont or None: 字体对象
+        """
+        font_info = self.font_cache.get(font_name)
+        if not font_info:
+            return None
+        if font_info['object'] is not None:
+            return font_info['object']
+        return TTFont(font_info['path'], lazy=True)
+    
+    def is_char_supported(self, font_name, char):
+        """
+        检查字体是否支持指定字符
+        
+        Args:
+            font_name (str): 字体名称
+            char (str): 要检查的字符
+            
+        Returns:
+            bool: 是否支持
+        """
+        font_info = self.font_cache.get(font_name)
+        if not font_info:
+            return False
+        
+        char_code = ord(char)
         return char_code in font_info['chars']
\ No newline at end of file
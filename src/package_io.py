@@ -0,0 +1,129 @@
+"""
+文档包读写
+保存时只重新写入被修改的部件，其余部件（图片、嵌入字体、主题等）
+直接复制压缩包中已压缩的数据，不再解压和重新压缩。
+"""
+
+import sys
+import struct
+import zipfile
+
+# 重新写入部件时的默认压缩级别（zlib默认值）
+DEFAULT_COMPRESS_LEVEL = 6
+# 写入输出文件时的临时后缀，写完后改名为输出文件，中断时不会留下不完整的文档
+PARTIAL_SUFFIX = ".partial"
+
+_LOCAL_HEADER = struct.Struct("<4s2B4HL2L2H")
+_LOCAL_HEADER_SIGNATURE = b"PK\003\004"
+_DATA_DESCRIPTOR_FLAG = 0x08
+
+# 直接写入原始压缩数据需要使用ZipFile的内部属性，只在验证过的Python版本上启用，
+# 其他版本或属性不存在时改为解压后重新压缩（结果相同，只是较慢）
+_RAW_COPY_MAX_VERSION = (3, 13)
+_RAW_COPY_ATTRS = ('fp', 'filelist', 'NameToInfo', 'start_dir', '_didModify')
+# ZipInfo的压缩级别属性：Python 3.13起为公开的compress_level，之前为_compresslevel
+_COMPRESS_LEVEL_ATTR = next((name for name in ('compress_level', '_compresslevel')
+                             if hasattr(zipfile.ZipInfo, name)), None)
+
+
+def _can_copy_raw(zout):
+    return (sys.version_info[:2] <= _RAW_COPY_MAX_VERSION
+            and all(hasattr(zout, name) for name in _RAW_COPY_ATTRS))
+
+
+def copy_member_raw(src_fp, info, zout, zin):
+    """
+    将输入压缩包中的一个部件以原始压缩数据写入输出压缩包
+
+    Args:
+        src_fp: 以二进制方式打开的输入压缩包文件
+        info (ZipInfo): 输入压缩包中该部件的信息
+        zout (ZipFile): 以写模式打开的输出压缩包
+        zin (ZipFile): 由src_fp打开的输入压缩包（无法直接复制时用于读取部件）
+    """
+    if not _can_copy_raw(zout):
+        new_info = zipfile.ZipInfo(info.filename, date_time=info.date_time)
+        new_info.compress_type = info.compress_type
+        new_info.external_attr = info.external_attr
+        new_info.create_system = info.create_system
+        zout.writestr(new_info, zin.read(info))
+        return
+
+    src_fp.seek(info.header_offset)
+    header = _LOCAL_HEADER.unpack(src_fp.read(_LOCAL_HEADER.size))
+    if header[0] != _LOCAL_HEADER_SIGNATURE:
+        raise zipfile.BadZipFile(f"部件头损坏: {info.filename}")
+    src_fp.seek(header[-2] + header[-1], 1)  # 跳过文件名和扩展字段
+    data = src_fp.read(info.compress_size)
+
+    new_info = zipfile.ZipInfo(info.filename, date_time=info.date_time)
+    new_info.compress_type = info.compress_type
+    new_info.external_attr = info.external_attr
+    new_info.create_system = info.create_system
+    # 大小和CRC已知，直接写在部件头中，不再需要数据描述符
+    new_info.flag_bits = info.flag_bits & ~_DATA_DESCRIPTOR_FLAG
+    new_info.CRC = info.CRC
+    new_info.compress_size = info.compress_size
+    new_info.file_size = info.file_size
+
+    new_info.header_offset = zout.fp.tell()
+    zout.fp.write(new_info.FileHeader())
+    zout.fp.write(data)
+    zout.filelist.append(new_info)
+    zout.NameToInfo[new_info.filename] = new_info
+    zout.start_dir = zout.fp.tell()
+    zout._didModify = True
+
+
+def rewritten_zipinfo(info, compress_level=DEFAULT_COMPRESS_LEVEL):
+    """
+    为重新写入的部件创建ZipInfo
+    沿用原部件的时间戳，相同内容的输出文件逐字节一致
+    """
+    new_info = zipfile.ZipInfo(info.filename, date_time=info.date_time)
+    new_info.compress_type = zipfile.ZIP_DEFLATED
+    new_info.external_attr = info.external_attr
+    if _COMPRESS_LEVEL_ATTR is not None:
+        # ZipFile.open(ZipInfo)不使用ZipFile的默认级别
+        setattr(new_info, _COMPRESS_LEVEL_ATTR, compress_level)
+    return new_info
+
+
+def _package_parts(doc):
+    """文档包中的全部部件，键为压缩包内的名称"""
+    package = doc.part.package
+    parts = {}
+    for part in package.iter_parts():
+        parts[part.partname.membername] = part
+    return parts
+
+
+def save_document(doc, input_path, output_path, touched_partnames,
+                  compress_level=DEFAULT_COMPRESS_LEVEL):
+    """
+    保存由input_path加载的文档，只重新序列化被修改的部件
+
+    Args:
+        doc: python-docx文档对象
+        input_path (str): 文档的原始文件
+        output_path (str): 输出文件
+        touched_partnames (iterable): 被修改的部件名称，如 "word/document.xml"
+        compress_level (int): 重新写入部件的压缩级别（0-9）
+    """
+    touched = {name.lstrip("/") for name in touched_partnames}
+    parts = _package_parts(doc)
+
+    with open(input_path, "rb") as src_fp, zipfile.ZipFile(src_fp) as zin:
+        names = set(zin.namelist())
+        # 部件或关系发生增删时无法逐个复制，交给python-docx完整保存
+        if not set(parts) <= names:
+            doc.save(output_path)
+            return
+
+        with zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED,
+                             compresslevel=compress_level) as zout:
+            for info in zin.infolist():
+                if info.filename in touched:
+                    zout.writestr(rewritten_zipinfo(info, compress_level), parts[info.filename].blob)
+                else:
+                    copy_member_raw(src_fp, info, zout, zin)
@@ -0,0 +1,105 @@
+"""
+段落并行
+将单个文档中各段落的逐字符属性计算和run生成分配到进程池中。
+主进程按顺序处理行间距与缩进并为每个段落派生种子，工作进程返回序列化的run，
+主进程再按文档顺序放回各段落。字体索引在进程启动时传入一次。
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+# 每个任务包含的字符数上限（任务过小时进程间通信开销占比过高）
+CHUNK_CHARS = 20000
+# 每个任务至少包含的字符数
+MIN_CHUNK_CHARS = 1000
+# 流式模式下段落并行时每批处理的正文元素个数
+PARALLEL_BATCH_BLOCKS = 512
+# 每个进程同时提交的任务数（逐个提交，取消时未提交的任务不再执行）
+TASKS_IN_FLIGHT_PER_WORKER = 2
+
+# 工作进程内的转换器与转换状态（由_init_worker设置）
+_worker_converter = None
+_worker_job = None
+
+
+def _init_worker(converter_class, font_manager, options):
+    """工作进程初始化：创建转换器和转换状态，供该进程处理的所有段落复用"""
+    global _worker_converter, _worker_job
+    _worker_converter = converter_class(font_manager, options, log=lambda message: None)
+    _worker_job = _worker_converter.new_job()
+
+
+def _render_chunk(tasks):
+    return _worker_converter.render_paragraphs(_worker_job, tasks)
+
+
+def _task_chars(task):
+    return sum(len(piece[0]) for piece in task[1])
+
+
+class ParagraphPool:
+    """段落并行使用的进程池，一次转换内复用"""
+
+    def __init__(self, converter_class, font_manager, options, workers=None):
+        """
+        Args:
+            converter_class: 转换器类（工作进程中以相同的字体和选项创建）
+            font_manager (FontManager): 已加载的字体管理器
+            options (ConversionOptions): 转换选项
+            workers (int): 进程数，None或0表示CPU核心数
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                            initargs=(converter_class, font_manager, options))
+
+    def _split(self, tasks):
+        """按字符数将段落分组，使每个进程分到若干个大小相近的任务"""
+        total_chars = sum(_task_chars(task) for task in tasks)
+        target = max(MIN_CHUNK_CHARS, min(CHUNK_CHARS, total_chars // (self.workers * 4)))
+        chunks = []
+        chunk = []
+        chunk_chars = 0
+        for task in tasks:
+            chunk.append(task)
+            chunk_chars += _task_chars(task)
+            if chunk_chars >= target:
+                chunks.append(chunk)
+                chunk = []
+                chunk_chars = 0
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+
+    def render(self, tasks, check=None):
+        """
+        在进程池中生成段落的run
+
+        Args:
+            tasks (list): [(段落种子, 需要处理的run), ...]，按文档顺序
+            check (callable): 提交每个任务和取回每个结果前调用，抛出异常时撤销未完成的任务并停止
+
+        Returns:
+            list: 按文档顺序的 [(序列化的段落XML, 统计信息), ...]
+        """
+        results = []
+        pending = deque()
+        try:
+            for chunk in self._split(tasks):
+                if check is not None:
+                    check()
+                if len(pending) >= self.workers * TASKS_IN_FLIGHT_PER_WORKER:
+                    results.append(pending.popleft().result())
+                pending.append(self.executor.submit(_render_chunk, chunk))
+            while pending:
+                if check is not None:
+                    check()
+                results.append(pending.popleft().result())
+        except BaseException:
+            for future in pending:
+                future.cancel()
+            raise
+        return results
+
+    def close(self):
+        self.executor.shutdown()
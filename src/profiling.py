@@ -0,0 +1,144 @@
+"""
+转换过程的性能分析
+按阶段记录耗时和调用次数（文档加载、段落预处理、逐字符属性计算、run生成、保存等），
+可选地以cProfile记录逐函数的耗时与调用次数，以tracemalloc记录各阶段的内存峰值。
+结果放在统计信息的 'profile' 中，并写入输出文件旁的JSON文件（<输出文件>.profile.json）。
+
+各阶段互不嵌套；未计入任何阶段的时间（如流式模式的解析与写出）记为 other_seconds。
+"""
+
+import os
+import json
+import time
+import pstats
+import cProfile
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+# 性能分析结果文件的后缀（追加在输出文件名之后）
+PROFILE_SUFFIX = ".profile.json"
+# 报告中保留的函数数量（按自身耗时排序）
+TOP_FUNCTIONS = 30
+
+_NULL_STAGE = nullcontext()
+
+
+def stage(profiler, name):
+    """profiler为None时返回空的上下文管理器，转换代码无需判断是否启用了性能分析"""
+    return _NULL_STAGE if profiler is None else profiler.stage(name)
+
+
+class Profiler:
+    """一次转换的性能分析记录"""
+
+    def __init__(self, use_cprofile=False, trace_memory=False):
+        """
+        Args:
+            use_cprofile (bool): 以cProfile记录逐函数的耗时和调用次数（开销较大）
+            trace_memory (bool): 以tracemalloc记录各阶段的Python堆峰值（开销较大）
+        """
+        self.use_cprofile = use_cprofile
+        self.trace_memory = trace_memory
+        self.stages = {}  # 阶段名称 -> {seconds, calls[, memory_peak_bytes]}
+        self.wall_seconds = 0.0
+        self.memory_peak_bytes = None
+        self._start = None
+        self._cprofile = None
+        self._owns_tracing = False
+
+    def start(self):
+        self._start = time.perf_counter()
+        if self.trace_memory:
+            # 已经在跟踪内存时（如外部调用方启动了tracemalloc）不重复启动，也不负责停止
+            self._owns_tracing = not tracemalloc.is_tracing()
+            if self._owns_tracing:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        if self.use_cprofile:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def stop(self):
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        if self.trace_memory:
+            self.memory_peak_bytes = max([self.memory_peak_bytes or 0, tracemalloc.get_traced_memory()[1]] +
+                                         [entry['memory_peak_bytes'] for entry in self.stages.values()])
+            if self._owns_tracing:
+                tracemalloc.stop()
+        self.wall_seconds = time.perf_counter() - self._start
+
+    @contextmanager
+    def stage(self, name):
+        """记录一次阶段执行的耗时（和内存峰值）"""
+        entry = self.stages.get(name)
+        if entry is None:
+            entry = self.stages[name] = {'seconds': 0.0, 'calls': 0}
+            if self.trace_memory:
+                entry['memory_peak_bytes'] = 0
+        if self.trace_memory:
+            # 阶段互不嵌套，可以在每个阶段开始时重置峰值
+            self.memory_peak_bytes = max(self.memory_peak_bytes or 0, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry['seconds'] += time.perf_counter() - start
+            entry['calls'] += 1
+            if self.trace_memory:
+                entry['memory_peak_bytes'] = max(entry['memory_peak_bytes'], tracemalloc.get_traced_memory()[1])
+
+    def _top_functions(self):
+        """cProfile结果中自身耗时最多的函数"""
+        stats = pstats.Stats(self._cprofile)
+        functions = []
+        for (filename, line, name), (_, calls, own, cumulative, _) in stats.stats.items():
+            functions.append({
+                'function': f"{os.path.basename(filename)}:{line}({name})",
+                'calls': calls,
+                'own_seconds': round(own, 6),
+                'cumulative_seconds': round(cumulative, 6)
+            })
+        functions.sort(key=lambda item: item['own_seconds'], reverse=True)
+        return functions[:TOP_FUNCTIONS]
+
+    def to_dict(self):
+        """可JSON序列化的分析结果"""
+        stages = {name: dict(entry, seconds=round(entry['seconds'], 6)) for name, entry in self.stages.items()}
+        staged = sum(entry['seconds'] for entry in self.stages.values())
+        result = {
+            'wall_seconds': round(self.wall_seconds, 6),
+            'stages': stages,
+            'other_seconds': round(max(0.0, self.wall_seconds - staged), 6)
+        }
+        if self.trace_memory:
+            result['memory_peak_bytes'] = self.memory_peak_bytes
+        if self._cprofile is not None:
+            result['functions'] = self._top_functions()
+        return result
+
+
+def write_sidecar(output_path, profile):
+    """将分析结果写入输出文件旁的JSON文件，返回其路径"""
+    path = output_path + PROFILE_SUFFIX
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(profile, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def format_profile(profile):
+    """将分析结果整理为便于阅读的文本行"""
+    wall = profile['wall_seconds'] or 1e-9
+    lines = [f"总耗时 {profile['wall_seconds']:.3f} 秒"]
+    entries = list(profile['stages'].items()) + [('other', {'seconds': profile['other_seconds'], 'calls': None})]
+    for name, entry in entries:
+        line = f"  {name:<16}{entry['seconds']:>9.3f} 秒 {entry['seconds'] / wall:>6.1%}"
+        if entry['calls'] is not None:
+            line += f"  {entry['calls']} 次"
+        if entry.get('memory_peak_bytes') is not None:
+            line += f"  内存峰值 {entry['memory_peak_bytes'] / (1024 * 1024):.1f} MB"
+        lines.append(line)
+    for item in profile.get('functions', [])[:10]:
+        lines.append(f"  {item['own_seconds']:>9.3f} 秒 {item['calls']:>9} 次  {item['function']}")
+    return lines
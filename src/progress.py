@@ -0,0 +1,136 @@
+"""
+转换进度通道
+转换线程只向队列中放入消息（进度、日志、完成、失败、取消），从不直接操作界面；
+界面线程定时取出队列中的全部消息：日志合并为一次插入，进度只保留最新的一条。
+进度消息在转换线程中按固定间隔节流，超大文档也不会产生大量消息。
+"""
+
+import time
+import queue
+
+# 转换线程发送进度消息的最小间隔（秒）
+PROGRESS_INTERVAL = 0.1
+# 界面线程轮询队列的间隔（毫秒）
+POLL_INTERVAL_MS = 100
+
+# 消息类型
+LOG = "log"
+PROGRESS = "progress"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+class ProgressReporter:
+    """
+    转换线程一侧的进度通道
+    统计已处理的段落数和字符数，按PROGRESS_INTERVAL节流后放入队列
+    """
+
+    def __init__(self, interval=PROGRESS_INTERVAL):
+        self.queue = queue.Queue()
+        self.interval = interval
+        self.total_paragraphs = None  # 总数未知时（如流式模式）为None，不估计剩余时间
+        self.total_chars = None
+        self.paragraphs = 0
+        self.chars = 0
+        self.started = time.monotonic()
+        self.last_sent = 0.0
+
+    def log(self, message):
+        """发送一条日志（可直接作为DocumentConverter的log参数）"""
+        self.queue.put((LOG, message))
+
+    def set_totals(self, paragraphs, chars):
+        """设置需要处理的段落和字符总数（可多次调用累加，如正文、页眉、页脚分别统计）"""
+        self.total_paragraphs = (self.total_paragraphs or 0) + paragraphs
+        self.total_chars = (self.total_chars or 0) + chars
+        self._send()
+
+    def advance(self, paragraphs, chars):
+        """记录新处理的段落和字符，距离上次发送超过间隔时发送进度"""
+        self.paragraphs += paragraphs
+        self.chars += chars
+        if time.monotonic() - self.last_sent >= self.interval:
+            self._send()
+
+    def done(self, output_path, stats):
+        self._send()
+        self.queue.put((DONE, (output_path, stats)))
+
+    def failed(self, error_msg, details=None):
+        """
+        Args:
+            error_msg (str): 错误信息
+            details (str): 转换线程中格式化的异常堆栈
+        """
+        self.queue.put((FAILED, (error_msg, details)))
+
+    def cancelled(self):
+        self._send()
+        self.queue.put((CANCELLED, None))
+
+    def snapshot(self):
+        """当前进度：已处理/总数、已用时间和预计剩余时间（秒）"""
+        elapsed = time.monotonic() - self.started
+        eta = None
+        if self.total_chars and self.chars:
+            fraction = min(1.0, self.chars / self.total_chars)
+            eta = elapsed * (1 - fraction) / fraction
+        # 随机缩进会增加少量字符，已处理字符数不超过原文的字符总数
+        chars = self.chars if self.total_chars is None else min(self.chars, self.total_chars)
+        return {
+            'paragraphs': self.paragraphs,
+            'chars': chars,
+            'total_paragraphs': self.total_paragraphs,
+            'total_chars': self.total_chars,
+            'elapsed': elapsed,
+            'eta': eta
+        }
+
+    def _send(self):
+        self.last_sent = time.monotonic()
+        self.queue.put((PROGRESS, self.snapshot()))
+
+    def drain(self):
+        """
+        取出队列中的全部消息（在界面线程中调用）
+
+        Returns:
+            tuple: (日志列表, 最新的进度或None, 结束消息 (DONE/FAILED/CANCELLED, 内容) 或None)
+        """
+        logs = []
+        latest = None
+        finished = None
+        while True:
+            try:
+                kind, payload = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind == LOG:
+                logs.append(payload)
+            elif kind == PROGRESS:
+                latest = payload
+            else:
+                finished = (kind, payload)
+        return logs, latest, finished
+
+
+def format_progress(progress):
+    """将进度整理为一行文本"""
+    if progress['total_chars']:
+        percent = min(1.0, progress['chars'] / progress['total_chars'])
+        text = (f"已处理 {progress['paragraphs']}/{progress['total_paragraphs']} 个段落，"
+                f"{progress['chars']}/{progress['total_chars']} 个字符 ({percent:.0%})")
+    else:
+        text = f"已处理 {progress['paragraphs']} 个段落，{progress['chars']} 个字符"
+    if progress['eta'] is not None:
+        text += f"，预计剩余 {progress['eta']:.0f} 秒"
+    return text
+
+
+def fraction_done(progress):
+    """完成比例（0-1），总数未知时为None"""
+    if not progress['total_chars']:
+        return None
+    return min(1.0, progress['chars'] / progress['total_chars'])
@@ -0,0 +1,181 @@
+"""
+转换结果缓存
+以 输入文档内容 + 转换选项 + 字体集合指纹 的SHA-256为键，在磁盘上保存转换结果和统计信息。
+只有指定了随机种子时结果才可重现，因此未指定种子的转换不使用缓存。
+
+缓存总大小有上限，超出时按最近使用时间（文件修改时间，命中时更新）删除最久未用的结果。
+条目以独立文件保存，可由多个进程（批量转换、转换服务）同时读写。
+"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+
+try:
+    from .package_io import PARTIAL_SUFFIX
+except ImportError:
+    from package_io import PARTIAL_SUFFIX
+
+# 缓存格式版本，转换结果的生成方式变化时递增，使旧结果失效
+RESULT_CACHE_VERSION = 1
+# 默认缓存大小上限（字节）
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+# 计算输入文档摘要时的读取块大小
+HASH_CHUNK_SIZE = 1 << 20
+# 不影响转换结果的选项，不计入缓存键
+NON_OUTPUT_OPTIONS = ('profile', 'profile_functions', 'profile_memory')
+
+_RESULT_SUFFIX = ".docx"
+_STATS_SUFFIX = ".json"
+
+
+def hash_file(path):
+    """文件内容的SHA-256十六进制摘要"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """磁盘上的转换结果缓存，按总大小限制并以LRU方式淘汰"""
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Args:
+            cache_dir (str): 缓存目录，不存在时自动创建
+            max_bytes (int): 缓存总大小上限（字节）
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key_for(self, input_path, options, font_manager):
+        """
+        计算转换结果的缓存键
+
+        Args:
+            input_path (str): 输入的.docx文件
+            options (ConversionOptions): 转换选项（必须指定种子）
+            font_manager (FontManager): 已加载的字体管理器
+
+        Returns:
+            str: 缓存键（SHA-256十六进制摘要）
+        """
+        options_dict = options.to_dict()
+        for name in NON_OUTPUT_OPTIONS:
+            options_dict.pop(name, None)
+        identity = {
+            'version': RESULT_CACHE_VERSION,
+            'input': hash_file(input_path),
+            'options': options_dict,
+            'fonts': font_manager.get_fingerprint()
+        }
+        return hashlib.sha256(json.dumps(identity, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _paths(self, key):
+        base = os.path.join(self.cache_dir, key)
+        return base + _RESULT_SUFFIX, base + _STATS_SUFFIX
+
+    def get(self, key, output_path):
+        """
+        命中时将缓存的结果复制到output_path
+
+        Returns:
+            dict or None: 保存的统计信息（used_fonts为列表），未命中时为None
+        """
+        result_path, stats_path = self._paths(key)
+        # 与正常转换相同，先复制到临时文件再改名，复制中断时不会留下不完整的文档
+        partial_path = output_path + PARTIAL_SUFFIX
+        try:
+            with open(stats_path, encoding="utf-8") as f:
+                stats = json.load(f)
+            shutil.copyfile(result_path, partial_path)
+            os.replace(partial_path, output_path)
+        except (OSError, ValueError):
+            return None
+        finally:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+
+        # 更新修改时间，记录最近一次使用
+        now = time.time()
+        for path in (result_path, stats_path):
+            try:
+                os.utime(path, (now, now))
+            except OSError:
+                pass
+        return stats
+
+    def put(self, key, output_path, stats):
+        """
+        保存转换结果和统计信息，然后按大小上限淘汰旧结果
+
+        Args:
+            key (str): 缓存键
+            output_path (str): 转换结果文件
+            stats (dict): 可JSON序列化的统计信息
+        """
+        result_path, stats_path = self._paths(key)
+        try:
+            # 先写入临时文件再改名，其他进程不会读到写了一半的结果；统计信息最后写入，作为条目完整的标志
+            with open(output_path, "rb") as source:
+                self._write_atomic(result_path, lambda f: shutil.copyfileobj(source, f))
+            payload = json.dumps(stats, ensure_ascii=False).encode("utf-8")
+            self._write_atomic(stats_path, lambda f: f.write(payload))
+        except OSError as e:
+            print(f"写入转换结果缓存时出错: {e}")
+            return
+        self.evict()
+
+    def _write_atomic(self, path, write):
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _entries(self):
+        """全部条目：[(最近使用时间, 大小, 键), ...]"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(_RESULT_SUFFIX):
+                continue
+            key = name[:-len(_RESULT_SUFFIX)]
+            total = 0
+            used = 0
+            try:
+                for path in self._paths(key):
+                    stat = os.stat(path)
+                    total += stat.st_size
+                    used = max(used, stat.st_mtime)
+            except OSError:
+                continue
+            entries.append((used, total, key))
+        return entries
+
+    def size(self):
+        """缓存当前占用的字节数"""
+        return sum(total for _, total, _ in self._entries())
+
+    def evict(self):
+        """删除最久未使用的结果，直到总大小不超过上限"""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, key in entries:
+            if total <= self.max_bytes:
+                break
+            for path in self._paths(key):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
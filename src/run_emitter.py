@@ -0,0 +1,131 @@
+"""
+run生成
+根据逐字符计算好的属性在段落中生成新的run。
+
+run属性以元组表示:
+    (字体名称, 粗体, 斜体, 下划线, 字号, 倾斜, 位置)
+其中字号、倾斜和位置均以半磅为单位，None表示不设置。
+"""
+
+from copy import deepcopy
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+from docx.shared import Emu
+from docx.text.run import Run
+
+# 需要python-docx处理的特殊字符（制表符、换行）
+_SPECIAL_CHARS = frozenset('\t\n\r')
+
+
+def append_position(run_element, half_points):
+    """为run追加位置偏移（单位: 半磅，None表示不偏移）"""
+    try:
+        if half_points is None:
+            return
+
+        rpr = run_element.get_or_add_rPr()
+
+        # 使用位置偏移设置字符高度
+        position_elem = OxmlElement('w:position')
+        position_elem.set(qn('w:val'), str(half_points))
+        rpr.append(position_elem)
+
+    except Exception as e:
+        # 忽略位置应用错误，不影响主要功能
+        pass
+
+
+def _apply_format(run, font_name, bold, italic, underline, size):
+    """通过python-docx代理对象设置字体与基本格式"""
+    if font_name:
+        run.font.name = font_name
+        run._element.rPr.rFonts.set(qn('w:eastAsia'), font_name)
+
+    # 恢复基本格式
+    run.bold = bold
+    run.italic = italic
+    run.underline = underline
+
+    if size is not None:
+        run.font.size = Emu(size * 6350)  # 半磅 -> EMU
+
+
+def add_styled_run(paragraph, text, key):
+    """
+    使用python-docx代理对象在段落末尾添加run
+
+    每个run都要经过Run/Font代理，速度较慢，保留作为对照实现
+    """
+    font_name, bold, italic, underline, size, tilt, position = key
+    new_run = paragraph.add_run(text)
+    _apply_format(new_run, font_name, bold, italic, underline, size)
+
+    # 倾斜和高度位置都以位置偏移实现
+    append_position(new_run._element, tilt)
+    append_position(new_run._element, position)
+
+
+class RunEmitter:
+    """
+    run快速生成器
+    为每种 字体/格式 组合构建一次<w:r>模板，生成run时直接克隆模板、
+    填写字号和文本，最后批量插入段落，不再经过python-docx的代理对象。
+    生成的XML与add_styled_run完全一致。
+    """
+
+    def __init__(self):
+        self._templates = {}  # (字体, 粗体, 斜体, 下划线, 是否设置字号) -> (模板, sz下标)
+        self._position = OxmlElement('w:position')
+
+    def _get_template(self, font_name, bold, italic, underline, has_size):
+        template_key = (font_name, bold, italic, underline, has_size)
+        template = self._templates.get(template_key)
+        if template is None:
+            # 模板只构建一次，借助代理对象保证与python-docx的输出一致
+            r = OxmlElement('w:r')
+            _apply_format(Run(r, None), font_name, bold, italic, underline,
+                          1 if has_size else None)
+            sz_index = None
+            if has_size:
+                sz_index = list(r.rPr).index(r.rPr.find(qn('w:sz')))
+            r.append(OxmlElement('w:t'))
+            template = (r, sz_index)
+            self._templates[template_key] = template
+        return template
+
+    def make_run(self, text, key):
+        """按属性构建一个<w:r>元素（尚未插入文档）"""
+        font_name, bold, italic, underline, size, tilt, position = key
+        template, sz_index = self._get_template(font_name, bold, italic, underline, size is not None)
+
+        r = deepcopy(template)
+        rpr = r[0]
+        if sz_index is not None:
+            rpr[sz_index].set(qn('w:val'), str(size))
+
+        for half_points in (tilt, position):
+            if half_points is not None:
+                position_elem = deepcopy(self._position)
+                position_elem.set(qn('w:val'), str(half_points))
+                rpr.append(position_elem)
+
+        if _SPECIAL_CHARS.isdisjoint(text):
+            t = r[-1]
+            t.text = text
+            if text != text.strip():
+                t.set('{http://www.w3.org/XML/1998/namespace}space', 'preserve')
+        else:
+            # 制表符和换行需要转换为<w:tab/>、<w:br/>，交给python-docx处理
+            r.remove(r[-1])
+            r.text = text
+        return r
+
+    def emit(self, paragraph, segments):
+        """
+        在段落末尾批量添加run
+
+        Args:
+            paragraph: python-docx段落对象
+            segments (list): [(文本, run属性), ...]
+        """
+        paragraph._p.extend([self.make_run(text, key) for text, key in segments])
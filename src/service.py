@@ -0,0 +1,427 @@
+"""
+转换服务
+基于asyncio的本地HTTP任务服务（只使用标准库），供内部工具调用：
+  POST /jobs               上传.docx（请求体为文档内容），返回任务编号；
+                           查询参数可覆盖转换选项，如 /jobs?seed=1&handwriting_strength=5
+  GET  /jobs/<id>          任务状态、统计信息和各阶段耗时
+  GET  /jobs/<id>/result   下载转换结果，统计信息放在 X-Conversion-Stats 响应头中
+  GET  /status             队列长度、运行中的任务数和最近任务的耗时
+
+上传的文档进入有界队列，由固定大小的进程池转换，
+字体索引在进程启动时传给每个工作进程一次，之后的任务不再重复加载。
+"""
+
+import os
+import json
+import time
+import uuid
+import shutil
+import asyncio
+import tempfile
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import fields, replace
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
+
+try:
+    from .converter import ConversionOptions, DocumentConverter, stats_to_dict
+    from .profiling import PROFILE_SUFFIX
+except ImportError:
+    from converter import ConversionOptions, DocumentConverter, stats_to_dict
+    from profiling import PROFILE_SUFFIX
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# 排队任务数上限，超过时返回503
+DEFAULT_MAX_QUEUE = 64
+# 上传文档大小上限（字节）
+MAX_UPLOAD_BYTES = 200 * 1024 * 1024
+# 读取上传内容和发送结果的块大小
+IO_CHUNK_SIZE = 1 << 20
+# 保留的已结束任务数，超过时删除最早的任务及其文件
+KEEP_FINISHED_JOBS = 100
+# 统计耗时使用的最近任务数
+LATENCY_WINDOW = 100
+
+DOCX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+# 不允许通过查询参数修改的选项：服务本身已经按进程池并行；
+# 性能分析只能由启动服务时的参数开启（开销较大，且会在工作目录中写入分析结果文件）
+FIXED_OPTIONS = ('paragraph_workers', 'profile', 'profile_functions', 'profile_memory')
+
+_REASONS = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found",
+            405: "Method Not Allowed", 409: "Conflict", 413: "Payload Too Large",
+            500: "Internal Server Error", 503: "Service Unavailable"}
+
+# 工作进程内的字体管理器与结果缓存（由_init_worker设置）
+_worker_font_manager = None
+_worker_result_cache = None
+
+
+def _init_worker(font_manager, result_cache=None):
+    """工作进程初始化：保存字体索引和结果缓存，供该进程处理的所有任务复用"""
+    global _worker_font_manager, _worker_result_cache
+    _worker_font_manager = font_manager
+    _worker_result_cache = result_cache
+
+
+def _run_conversion(input_path, output_path, options):
+    """在工作进程中转换一个文档，返回可JSON序列化的统计信息"""
+    converter = DocumentConverter(_worker_font_manager, options, log=lambda message: None,
+                                  result_cache=_worker_result_cache)
+    return stats_to_dict(converter.convert(input_path, output_path))
+
+
+def _parse_option(value, default, kind):
+    """按选项的类型（默认值为None时按字段声明的类型）解析查询参数"""
+    if isinstance(default, str) or kind in (str, Optional[str]):
+        return value
+    if isinstance(default, bool):
+        if value.lower() in ("1", "true", "yes", "on"):
+            return True
+        if value.lower() in ("0", "false", "no", "off"):
+            return False
+        raise ValueError(f"无效的布尔值: {value}")
+    if isinstance(default, float):
+        return float(value)
+    return int(value)
+
+
+def options_from_query(base, query):
+    """
+    以查询参数覆盖默认转换选项
+
+    Args:
+        base (ConversionOptions): 服务的默认选项
+        query (str): URL查询字符串
+
+    Returns:
+        ConversionOptions
+    """
+    kinds = {field.name: field.type for field in fields(ConversionOptions) if field.name not in FIXED_OPTIONS}
+    changes = {}
+    for name, values in parse_qs(query).items():
+        if name not in kinds:
+            raise ValueError(f"未知的转换选项: {name}")
+        changes[name] = _parse_option(values[-1], getattr(base, name), kinds[name])
+    return replace(base, **changes)
+
+
+class ServiceJob:
+    """一个转换任务"""
+
+    def __init__(self, job_id, input_path, output_path, options):
+        self.id = job_id
+        self.input_path = input_path
+        self.output_path = output_path
+        self.options = options
+        self.status = "queued"  # queued / running / done / failed
+        self.error = None
+        self.stats = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+
+    def latency(self):
+        """各阶段耗时（秒）：排队、转换、总计"""
+        now = time.time()
+        started = self.started or now
+        finished = self.finished or now
+        return {
+            'queued_seconds': round(started - self.submitted, 3),
+            'run_seconds': round(finished - started, 3) if self.started else 0.0,
+            'total_seconds': round(finished - self.submitted, 3)
+        }
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'status': self.status,
+            'error': self.error,
+            'options': self.options.to_dict(),
+            'stats': self.stats,
+            'latency': self.latency()
+        }
+
+
+class ConversionService:
+    """任务队列与进程池，HTTP处理函数和转换调度都在同一个事件循环中运行"""
+
+    def __init__(self, font_manager, options=None, workers=None, max_queue=DEFAULT_MAX_QUEUE,
+                 work_dir=None, log=None, result_cache=None):
+        """
+        Args:
+            font_manager (FontManager): 已加载的字体管理器
+            options (ConversionOptions): 默认转换选项
+            workers (int): 工作进程数，None表示CPU核心数
+            max_queue (int): 排队任务数上限
+            work_dir (str): 保存上传文档和转换结果的目录，默认使用临时目录
+            log (callable): 日志输出函数，默认print
+            result_cache (ResultCache): 转换结果缓存，仅对指定了种子的任务生效
+        """
+        self.font_manager = font_manager
+        self.options = replace(options or ConversionOptions(), paragraph_workers=1)
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.owns_work_dir = work_dir is None
+        self.work_dir = work_dir or tempfile.mkdtemp(prefix="font_randomizer_")
+        os.makedirs(self.work_dir, exist_ok=True)
+        self.log = log or print
+        self.result_cache = result_cache
+
+        self.jobs = OrderedDict()
+        self.queue = None
+        self.uploading = 0  # 正在接收上传内容、已预留队列位置的任务数
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.executor = None
+        self.dispatchers = []
+
+    async def start(self):
+        """启动进程池和调度协程（每个工作进程对应一个调度协程）"""
+        self.queue = asyncio.Queue(maxsize=self.max_queue)
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                            initargs=(self.font_manager, self.result_cache))
+        self.dispatchers = [asyncio.create_task(self._dispatch()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self.dispatchers:
+            task.cancel()
+        await asyncio.gather(*self.dispatchers, return_exceptions=True)
+        self.executor.shutdown(cancel_futures=True)
+        if self.owns_work_dir:
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    async def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self.queue.get()
+            job.status = "running"
+            job.started = time.time()
+            self.running += 1
+            try:
+                job.stats = await loop.run_in_executor(self.executor, _run_conversion,
+                                                       job.input_path, job.output_path, job.options)
+                job.status = "done"
+                self.completed += 1
+                self.cache_hits += job.stats['cache_hits']
+                self.cache_misses += job.stats['cache_misses']
+            except Exception as e:
+                job.status = "failed"
+                job.error = str(e)
+                self.failed += 1
+            finally:
+                job.finished = time.time()
+                self.running -= 1
+                self.queue.task_done()
+                # 结束后不再需要上传的文档
+                if os.path.exists(job.input_path):
+                    os.remove(job.input_path)
+            self.latencies.append(job.latency())
+            self.log(f"任务 {job.id}: {'完成' if job.status == 'done' else '失败 - ' + job.error} "
+                     f"(排队 {job.latency()['queued_seconds']} 秒, 转换 {job.latency()['run_seconds']} 秒)")
+
+    def _prune(self):
+        """删除超出保留数量的已结束任务及其结果文件（包括性能分析结果）"""
+        finished = [job for job in self.jobs.values() if job.status in ("done", "failed")]
+        for job in finished[:max(0, len(finished) - KEEP_FINISHED_JOBS)]:
+            del self.jobs[job.id]
+            for path in (job.output_path, job.output_path + PROFILE_SUFFIX):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def status(self):
+        """服务状态：队列长度、运行中的任务数和最近任务的平均/最大耗时"""
+        def summarize(key):
+            values = sorted(latency[key] for latency in self.latencies)
+            if not values:
+                return None
+            return {
+                'mean': round(sum(values) / len(values), 3),
+                'p50': values[len(values) // 2],
+                'p95': values[min(len(values) - 1, int(len(values) * 0.95))],
+                'max': values[-1]
+            }
+
+        return {
+            'workers': self.workers,
+            'queue_depth': self.queue.qsize(),
+            'uploading': self.uploading,
+            'max_queue': self.max_queue,
+            'running': self.running,
+            'completed': self.completed,
+            'failed': self.failed,
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'fonts': len(self.font_manager.font_files),
+            'latency': {key: summarize(key) for key in ('queued_seconds', 'run_seconds', 'total_seconds')}
+        }
+
+    async def submit(self, reader, length, query):
+        """接收上传的文档并加入队列，返回 (状态码, 响应内容)"""
+        try:
+            options = options_from_query(self.options, query)
+        except ValueError as e:
+            await _discard(reader, length)
+            return 400, {'error': str(e)}
+        # 读取请求体之前预留队列位置，接收上传期间其他请求不会占满队列
+        if self.queue.qsize() + self.uploading >= self.max_queue:
+            await _discard(reader, length)
+            return 503, {'error': "队列已满，请稍后重试", 'queue_depth': self.queue.qsize()}
+
+        job_id = uuid.uuid4().hex
+        input_path = os.path.join(self.work_dir, f"{job_id}.in.docx")
+        output_path = os.path.join(self.work_dir, f"{job_id}.docx")
+        loop = asyncio.get_running_loop()
+        self.uploading += 1
+        try:
+            # 文件写入在线程池中执行，不阻塞事件循环
+            with open(input_path, "wb") as f:
+                remaining = length
+                while remaining:
+                    chunk = await reader.readexactly(min(IO_CHUNK_SIZE, remaining))
+                    await loop.run_in_executor(None, f.write, chunk)
+                    remaining -= len(chunk)
+        except BaseException:
+            if os.path.exists(input_path):
+                os.remove(input_path)
+            raise
+        finally:
+            self.uploading -= 1
+
+        job = ServiceJob(job_id, input_path, output_path, options)
+        self.jobs[job_id] = job
+        self.queue.put_nowait(job)
+        self._prune()
+        return 202, {'id': job_id, 'status': job.status, 'queue_depth': self.queue.qsize()}
+
+    async def handle(self, reader, writer):
+        """处理一个HTTP连接（每个连接一个请求，响应后关闭）"""
+        try:
+            request_line = await reader.readline()
+            method, target, _ = request_line.decode("latin-1").split(" ", 2)
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+        except (ValueError, asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+            return
+
+        url = urlsplit(target)
+        path = url.path.rstrip("/").split("/")[1:]
+        response_started = False  # 已发送状态行和响应头后出错只能关闭连接
+        try:
+            if path == ["jobs"] and method == "POST":
+                length = _content_length(headers)
+                if length is None:
+                    await _send_json(writer, 400, {'error': "无效的Content-Length"})
+                elif not length:
+                    await _send_json(writer, 400, {'error': "请求体应为.docx文档内容"})
+                elif length > MAX_UPLOAD_BYTES:
+                    await _send_json(writer, 413, {'error': f"文档超过 {MAX_UPLOAD_BYTES} 字节"})
+                else:
+                    await _send_json(writer, *await self.submit(reader, length, url.query))
+            elif path == ["status"] and method == "GET":
+                await _send_json(writer, 200, self.status())
+            elif len(path) in (2, 3) and path[0] == "jobs" and method == "GET":
+                job = self.jobs.get(path[1])
+                if job is None:
+                    await _send_json(writer, 404, {'error': "任务不存在"})
+                elif len(path) == 2:
+                    await _send_json(writer, 200, job.to_dict())
+                elif path[2] != "result":
+                    await _send_json(writer, 404, {'error': "未知的路径"})
+                elif job.status != "done":
+                    await _send_json(writer, 409, {'error': "任务尚未完成", 'status': job.status})
+                else:
+                    with open(job.output_path, "rb") as f:
+                        response_started = True
+                        await _send_file(writer, f, job.stats)
+            elif path and path[0] in ("jobs", "status"):
+                await _send_json(writer, 405, {'error': "不支持的请求方法"})
+            else:
+                await _send_json(writer, 404, {'error': "未知的路径"})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            # 客户端已断开（包括上传未完成），连接上无法再发送响应
+            pass
+        except Exception as e:
+            if not response_started:
+                await _send_json(writer, 500, {'error': str(e)})
+        finally:
+            writer.close()
+
+
+def _content_length(headers):
+    """请求体长度，缺少时为0，不是非负整数时为None"""
+    value = headers.get("content-length", "0")
+    if not (value.isascii() and value.isdigit()):
+        return None
+    return int(value)
+
+
+async def _discard(reader, length):
+    """读取并丢弃请求体（拒绝请求时避免客户端写入失败）"""
+    while length:
+        chunk = await reader.read(min(IO_CHUNK_SIZE, length))
+        if not chunk:
+            break
+        length -= len(chunk)
+
+
+def _header_block(status, content_type, length, extra=None):
+    lines = [f"HTTP/1.1 {status} {_REASONS[status]}",
+             f"Content-Type: {content_type}",
+             f"Content-Length: {length}",
+             "Connection: close"]
+    for name, value in (extra or {}).items():
+        lines.append(f"{name}: {value}")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+async def _send_json(writer, status, payload):
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    writer.write(_header_block(status, "application/json; charset=utf-8", len(body)) + body)
+    await writer.drain()
+
+
+async def _send_file(writer, f, stats):
+    """分块发送已打开的转换结果文件，统计信息以ASCII JSON放在响应头中"""
+    extra = {'X-Conversion-Stats': json.dumps(stats, ensure_ascii=True),
+             'Content-Disposition': 'attachment; filename="converted.docx"'}
+    writer.write(_header_block(200, DOCX_CONTENT_TYPE, os.fstat(f.fileno()).st_size, extra))
+    while True:
+        chunk = f.read(IO_CHUNK_SIZE)
+        if not chunk:
+            break
+        writer.write(chunk)
+        await writer.drain()
+
+
+async def _serve(service, host, port):
+    await service.start()
+    server = await asyncio.start_server(service.handle, host, port)
+    service.log(f"转换服务已启动: http://{host}:{port} "
+                f"（{service.workers} 个工作进程，队列上限 {service.max_queue}）")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.stop()
+
+
+def serve(font_manager, options=None, host=DEFAULT_HOST, port=DEFAULT_PORT, workers=None,
+          max_queue=DEFAULT_MAX_QUEUE, work_dir=None, log=None, result_cache=None):
+    """启动转换服务，直到按下Ctrl+C"""
+    service = ConversionService(font_manager, options, workers, max_queue, work_dir, log, result_cache)
+    try:
+        asyncio.run(_serve(service, host, port))
+    except KeyboardInterrupt:
+        service.log("转换服务已停止")
@@ -0,0 +1,235 @@
+"""
+流式文档改写
+以增量解析器逐块读取主文档XML（word/document.xml），正文中的每个段落或表格
+解析完成后立即交给回调处理并写入输出压缩包，随后从内存中释放；
+页眉和页脚体积很小，整个解析后处理；压缩包中的其他部件直接复制原始压缩数据。峰值内存只取决于最大的单个段落/表格，而非整个文档。
+"""
+
+import zipfile
+import posixpath
+from lxml import etree
+from docx.oxml.ns import qn
+from docx.oxml.parser import element_class_lookup, parse_xml
+
+try:
+    from .package_io import DEFAULT_COMPRESS_LEVEL, copy_member_raw, rewritten_zipinfo
+    from .doc_walker import HEADER_FOOTER_RELTYPES
+except ImportError:
+    from package_io import DEFAULT_COMPRESS_LEVEL, copy_member_raw, rewritten_zipinfo
+    from doc_walker import HEADER_FOOTER_RELTYPES
+
+# 每次读取主文档XML的字节数
+CHUNK_SIZE = 1024 * 1024
+
+XML_DECLARATION = b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\r\n'
+OFFICE_DOCUMENT_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+PACKAGE_RELS_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+
+def find_main_document_part(zin):
+    """从包关系中找到主文档部件的名称，默认为 word/document.xml"""
+    try:
+        rels = etree.fromstring(zin.read("_rels/.rels"))
+    except KeyError:
+        return "word/document.xml"
+    for rel in rels.iter(f"{{{PACKAGE_RELS_NS}}}Relationship"):
+        if rel.get("Type") == OFFICE_DOCUMENT_REL:
+            return posixpath.normpath(rel.get("Target").lstrip("/"))
+    return "word/document.xml"
+
+
+def find_header_footer_parts(zin, document_part):
+    """从主文档的关系中找到页眉/页脚部件的名称"""
+    directory, filename = posixpath.split(document_part)
+    try:
+        rels = etree.fromstring(zin.read(posixpath.join(directory, "_rels", filename + ".rels")))
+    except KeyError:
+        return set()
+    parts = set()
+    for rel in rels.iter(f"{{{PACKAGE_RELS_NS}}}Relationship"):
+        if rel.get("Type") not in HEADER_FOOTER_RELTYPES or rel.get("TargetMode") == "External":
+            continue
+        target = rel.get("Target")
+        if target.startswith("/"):
+            parts.add(posixpath.normpath(target.lstrip("/")))
+        else:
+            parts.add(posixpath.normpath(posixpath.join(directory, target)))
+    return parts
+
+
+def collect_package_chars(input_path):
+    """
+    不加载文档，逐个解析主文档和页眉/页脚中的<w:t>，收集其中出现的不同字符（用于字形覆盖预检）
+    """
+    text_tag = qn('w:t')
+    chars = set()
+    with zipfile.ZipFile(input_path) as zin:
+        document_part = find_main_document_part(zin)
+        for part_name in [document_part] + sorted(find_header_footer_parts(zin, document_part)):
+            with zin.open(part_name) as src:
+                for _, element in etree.iterparse(src, tag=(text_tag, qn('w:p')),
+                                                  resolve_entities=False, huge_tree=True):
+                    if element.tag == text_tag:
+                        if element.text:
+                            chars.update(element.text)
+                    else:
+                        # 段落结束时释放其内容，内存占用不随文档大小增长
+                        element.clear(keep_tail=True)
+    return chars
+
+
+def _new_parser():
+    """创建使用python-docx元素类的增量解析器，段落等元素可直接用python-docx的接口操作"""
+    parser = etree.XMLPullParser(events=("start", "end"), remove_blank_text=True,
+                                 resolve_entities=False, huge_tree=True)
+    parser.set_element_class_lookup(element_class_lookup)
+    return parser
+
+
+def _serialize(element):
+    # 显式指定UTF-8，否则非ASCII字符会被写成字符引用
+    return etree.tostring(element, encoding="UTF-8", xml_declaration=False)
+
+
+def _end_tag(element):
+    prefix = element.prefix
+    name = etree.QName(element).localname
+    return (f"</{prefix}:{name}>" if prefix else f"</{name}>").encode("utf-8")
+
+
+class _BlockWriter:
+    """
+    将元素序列化到输出流
+    根元素上已声明的命名空间不在每个子元素上重复声明
+    """
+
+    def __init__(self, target):
+        self.target = target
+        self.declarations = []
+
+    def write_root_start(self, root):
+        """写入XML声明和根元素的起始标签（含全部命名空间声明）"""
+        shallow = etree.Element(root.tag, dict(root.attrib), nsmap=root.nsmap)
+        start = _serialize(shallow)
+        self.target.write(XML_DECLARATION)
+        self.target.write(start[:-2] + b">")
+        for prefix, uri in root.nsmap.items():
+            attr = f' xmlns:{prefix}="{uri}"' if prefix else f' xmlns="{uri}"'
+            self.declarations.append(attr.encode("utf-8"))
+
+    def _strip_declarations(self, data):
+        end = data.index(b">")
+        head = data[:end]
+        for declaration in self.declarations:
+            head = head.replace(declaration, b"", 1)
+        return head + data[end:]
+
+    def write_start(self, element):
+        """写入元素的起始标签（不含子元素）"""
+        shallow = etree.Element(element.tag, dict(element.attrib), nsmap=element.nsmap)
+        self.target.write(self._strip_declarations(_serialize(shallow))[:-2] + b">")
+
+    def write_element(self, element):
+        """写入完整的元素"""
+        self.target.write(self._strip_declarations(_serialize(element)))
+
+    def write_end(self, element):
+        self.target.write(_end_tag(element))
+
+
+def rewrite_document_xml(source, target, transform_blocks, chunk_size=CHUNK_SIZE, batch_size=1):
+    """
+    流式改写主文档XML
+
+    Args:
+        source: 可读的二进制流（原document.xml）
+        target: 可写的二进制流
+        transform_blocks (callable): 以正文（w:body）直接子元素的列表调用，
+            可就地修改这些元素，之后元素被写出并释放
+        chunk_size (int): 每次读取的字节数
+        batch_size (int): 每批处理的正文子元素个数，内存占用随之增加
+    """
+    parser = _new_parser()
+    writer = _BlockWriter(target)
+    body_tag = qn("w:body")
+    depth = 0
+    in_body = False
+    pending = []
+
+    def flush():
+        transform_blocks(pending)
+        for block in pending:
+            writer.write_element(block)
+            block.getparent().remove(block)
+        pending.clear()
+
+    while True:
+        chunk = source.read(chunk_size)
+        if chunk:
+            parser.feed(chunk)
+        else:
+            parser.close()
+
+        for event, element in parser.read_events():
+            if event == "start":
+                depth += 1
+                if depth == 1:
+                    writer.write_root_start(element)
+                elif depth == 2 and element.tag == body_tag:
+                    writer.write_start(element)
+                    in_body = True
+                continue
+
+            if depth == 3 and in_body:
+                # 正文中的段落/表格已完整解析
+                pending.append(element)
+                if len(pending) >= batch_size:
+                    flush()
+            elif depth == 2:
+                if element.tag == body_tag:
+                    if pending:
+                        flush()
+                    writer.write_end(element)
+                    in_body = False
+                else:
+                    writer.write_element(element)
+                element.getparent().remove(element)
+            elif depth == 1:
+                writer.write_end(element)
+            depth -= 1
+
+        if not chunk:
+            break
+
+
+def stream_convert_package(input_path, output_path, transform_blocks, transform_parts=None,
+                           compress_level=DEFAULT_COMPRESS_LEVEL, batch_size=1):
+    """
+    流式转换.docx文件：主文档XML边读边改写，页眉/页脚整体改写，
+    其余部件直接复制原始压缩数据
+
+    Args:
+        input_path (str): 输入的.docx文件
+        output_path (str): 输出的.docx文件
+        transform_blocks (callable): 见 rewrite_document_xml
+        transform_parts (callable): 以[页眉/页脚的根元素]调用，None表示不处理页眉/页脚
+        compress_level (int): 改写后部件的压缩级别（0-9）
+        batch_size (int): 见 rewrite_document_xml
+    """
+    with open(input_path, "rb") as src_fp, zipfile.ZipFile(src_fp) as zin, \
+            zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED,
+                            compresslevel=compress_level) as zout:
+        document_part = find_main_document_part(zin)
+        story_parts = find_header_footer_parts(zin, document_part) if transform_parts else set()
+        for info in zin.infolist():
+            if info.filename == document_part:
+                new_info = rewritten_zipinfo(info, compress_level)
+                with zin.open(info) as src, zout.open(new_info, "w", force_zip64=True) as dst:
+                    rewrite_document_xml(src, dst, transform_blocks, batch_size=batch_size)
+            elif info.filename in story_parts:
+                root = parse_xml(zin.read(info))
+                transform_parts([root])
+                zout.writestr(rewritten_zipinfo(info, compress_level), etree.tostring(
+                    root, encoding="UTF-8", standalone=True))
+            else:
+                copy_member_raw(src_fp, info, zout, zin)
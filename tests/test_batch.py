@@ -0,0 +1,44 @@
+"""批量转换"""
+
+import os
+
+import pytest
+
+docx = pytest.importorskip("docx")
+
+from src.batch import convert_batch
+from src.converter import ConversionOptions
+from src.font_manager import FontManager
+
+FONTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "fonts")
+
+
+def _write_document(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    document = docx.Document()
+    document.add_paragraph(text)
+    document.save(path)
+
+
+def test_inputs_with_same_basename_keep_separate_outputs(tmp_path):
+    # 不同子目录中的同名文档按相对路径输出，互不覆盖，恢复时也分别判断是否完成
+    _write_document(str(tmp_path / "in" / "a" / "report.docx"), "Alpha")
+    _write_document(str(tmp_path / "in" / "b" / "report.docx"), "Beta Beta")
+    source = str(tmp_path / "in" / "**" / "*.docx")
+    output_dir = str(tmp_path / "out")
+    font_manager = FontManager(FONTS_DIR)
+    options = ConversionOptions(seed=1)
+
+    summary = convert_batch(source, output_dir, options, font_manager=font_manager, workers=1,
+                            log=lambda message: None)
+    assert summary['succeeded'] == 2
+    outputs = {os.path.relpath(result['output'], output_dir) for result in summary['files']}
+    assert outputs == {os.path.join("a", "report.docx"), os.path.join("b", "report.docx")}
+    texts = {output: docx.Document(os.path.join(output_dir, output)).paragraphs[0].text.strip() for output in outputs}
+    assert sorted(texts.values()) == ["Alpha", "Beta Beta"]
+
+    os.remove(os.path.join(output_dir, "b", "report.docx"))
+    summary = convert_batch(source, output_dir, options, font_manager=font_manager, workers=1,
+                            log=lambda message: None, resume=True)
+    assert summary['resumed'] == 1
+    assert os.path.exists(os.path.join(output_dir, "b", "report.docx"))
@@ -0,0 +1,28 @@
+"""逐字符属性批量生成"""
+
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.char_streams import MAX_STEP, StreamGenerator
+from src.converter import ConversionOptions
+from src.font_coverage import CharCoverage, CoverageIndex
+
+
+class SingleFont:
+    """只提供覆盖索引的字体管理器"""
+
+    def __init__(self):
+        self.coverage_index = CoverageIndex({"Font": CharCoverage.from_chars(range(0x20, 0x7F))})
+
+
+def test_char_sizes_stay_continuous_across_runs():
+    # 原始字号不同的run相邻时，字号也只能逐步过渡，不能按原始字号之差跳变
+    settings = ConversionOptions(char_size_strength=5).to_settings()
+    generator = StreamGenerator(SingleFont(), settings, random.Random(1))
+    pieces = [("a" * 40, 10.5), ("b" * 40, 12.0), (" " * 5, None), ("c" * 40, 10.5), ("d" * 40, 12.0)]
+    for _ in range(200):
+        sizes = generator.generate(pieces).size_points
+        assert np.abs(np.diff(sizes)).max() <= MAX_STEP + 1e-9
@@ -0,0 +1,14 @@
+"""字形覆盖预检"""
+
+import pickle
+
+from src.coverage_plan import CoverageError
+
+
+def test_coverage_error_survives_pickle():
+    # 工作进程中抛出的异常经pickle传回主进程，重建失败会导致进程池损坏
+    error = CoverageError(["\u200b", "₁", "!"])
+    restored = pickle.loads(pickle.dumps(error))
+    assert isinstance(restored, CoverageError)
+    assert restored.uncovered == error.uncovered
+    assert str(restored) == str(error)